@@ -9,7 +9,6 @@ from ipaddress import ip_address, ip_network
 from pathlib import Path
 
 import markdown
-import meraki
 import structlog
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
@@ -21,11 +20,17 @@ from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.responses import Response
 
-from .clients.meraki_client import get_all_relevant_meraki_clients
-from .clients.pihole_client import PiholeClient
-from .sync_logic import get_sync_interval, load_app_config_from_env
+from .logging_setup import configure_logging
+from .sync_logic import (
+    get_meraki_data,
+    get_pihole_client,
+    get_sync_interval,
+    load_app_config_from_env,
+    map_devices,
+)
 from .sync_logic import sync_pihole_dns as run_sync_main
 
+configure_logging()
 log = structlog.get_logger()
 
 def get_rate_limit():
@@ -121,9 +126,10 @@ templates = Jinja2Templates(directory="app/templates")
 @app.get("/", response_class=HTMLResponse)
 @limiter.limit(get_rate_limit)
 async def read_root(request: Request):
+    sync_interval = await asyncio.to_thread(get_sync_interval)
     return templates.TemplateResponse("index.html", {
         "request": request,
-        "sync_interval": get_sync_interval(),
+        "sync_interval": sync_interval,
         "app_logo_url": os.getenv("APP_LOGO_URL"),
         "app_color_scheme": os.getenv("APP_COLOR_SCHEME"),
     })
@@ -198,53 +204,21 @@ async def stream(request: Request):
 
     return StreamingResponse(event_stream(), media_type='text/event-stream')
 
-def _get_pihole_data(pihole_url, pihole_api_key):
-    client = PiholeClient(pihole_url, pihole_api_key)
+def _get_pihole_data(pihole_url, pihole_api_key, records_cache_ttl=0):
+    # Reuse the sync's client so the dashboard shares its keep-alive pool and Pi-hole session.
+    client = get_pihole_client(pihole_url, pihole_api_key, records_cache_ttl)
+    # The records request re-authenticates first if an earlier login failed.
+    pihole_records = client.get_custom_dns_records()
     if not client.sid:
         log.error("Failed to authenticate to Pi-hole in _get_pihole_data.")
         return None, None
 
-    pihole_records = client.get_custom_dns_records()
     if pihole_records is None:
         log.error("Failed to get Pi-hole records in _get_pihole_data.")
         return None, None
 
     return client.sid, pihole_records
 
-def _get_meraki_data(config):
-    dashboard = meraki.DashboardAPI(
-        api_key=config["meraki_api_key"],
-        output_log=False,
-        print_console=False,
-        suppress_logging=True,
-    )
-    return get_all_relevant_meraki_clients(dashboard, config)
-
-def _map_devices(meraki_clients, pihole_records):
-    mapped_devices = []
-    unmapped_meraki_devices = []
-
-    # Pre-compute a mapping of IP to list of domains for O(1) lookups
-    ip_to_domains = {}
-    for domain, ip in pihole_records.items():
-        if ip not in ip_to_domains:
-            ip_to_domains[ip] = []
-        ip_to_domains[ip].append(domain)
-
-    for client in meraki_clients:
-        client_ip = client['ip']
-        if client_ip in ip_to_domains:
-            for domain in ip_to_domains[client_ip]:
-                mapped_devices.append({
-                    "meraki_name": client['name'],
-                    "pihole_domain": domain,
-                    "ip": client_ip
-                })
-        else:
-            unmapped_meraki_devices.append(client)
-
-    return mapped_devices, unmapped_meraki_devices
-
 _mappings_cache = None
 _mappings_cache_time = 0
 
@@ -266,7 +240,7 @@ def get_mappings_data():
             # Reconstruct the mapped list since cache.json only stores the count
             pihole_records = cache_data.get("pihole", {})
             meraki_clients = cache_data.get("meraki", [])
-            mapped_devices, unmapped_meraki_devices = _map_devices(meraki_clients, pihole_records)
+            mapped_devices, unmapped_meraki_devices = map_devices(meraki_clients, pihole_records)
             result = {
                 "pihole": pihole_records,
                 "meraki": meraki_clients,
@@ -281,15 +255,14 @@ def get_mappings_data():
 
     try:
         config = load_app_config_from_env()
-        pihole_url = os.getenv("PIHOLE_API_URL")
-        pihole_api_key = os.getenv("PIHOLE_API_KEY")
-
-        sid, pihole_records = _get_pihole_data(pihole_url, pihole_api_key)
+        sid, pihole_records = _get_pihole_data(
+            config["pihole_api_url"], config["pihole_api_key"], config["pihole_records_cache_ttl_seconds"]
+        )
         if not sid:
             return {}
 
-        meraki_clients = _get_meraki_data(config)
-        mapped_devices, unmapped_meraki_devices = _map_devices(meraki_clients, pihole_records)
+        meraki_clients = get_meraki_data(config)
+        mapped_devices, unmapped_meraki_devices = map_devices(meraki_clients, pihole_records)
 
         result = {"pihole": pihole_records, "meraki": meraki_clients, "mapped": mapped_devices, "unmapped_meraki": unmapped_meraki_devices}
         _mappings_cache = result
@@ -302,7 +275,8 @@ def get_mappings_data():
 @app.get("/mappings")
 @limiter.limit(get_rate_limit)
 async def get_mappings(request: Request):
-    return JSONResponse(content=get_mappings_data())
+    mappings = await asyncio.to_thread(get_mappings_data)
+    return JSONResponse(content=mappings)
 
 class UpdateIntervalRequest(BaseModel):
     interval: int = Field(ge=1, le=86400)
@@ -310,7 +284,7 @@ class UpdateIntervalRequest(BaseModel):
 @app.post("/update-interval")
 @limiter.limit(get_rate_limit)
 async def update_interval(request: Request, data: UpdateIntervalRequest):
-    Path("/app/sync_interval.txt").write_text(str(data.interval))
+    await asyncio.to_thread(Path("/app/sync_interval.txt").write_text, str(data.interval))
     log.info("Sync interval updated", interval=data.interval)
     return JSONResponse(content={"message": "Sync interval updated."})
 
@@ -324,7 +298,7 @@ class ClearLogRequest(BaseModel):
 async def clear_log(request: Request, data: ClearLogRequest):
     if data.log == 'sync':
         try:
-            Path('/app/logs/sync.log').write_text('')
+            await asyncio.to_thread(Path('/app/logs/sync.log').write_text, '')
             return JSONResponse(content={"message": "Sync log cleared."})
         except FileNotFoundError:
             return JSONResponse(content={"message": "Log file not found."}, status_code=404)
@@ -333,7 +307,7 @@ async def clear_log(request: Request, data: ClearLogRequest):
 @app.get("/docs", response_class=HTMLResponse)
 @limiter.limit(get_rate_limit)
 async def docs(request: Request):
-    content = Path('/app/README.md').read_text()
+    content = await asyncio.to_thread(Path('/app/README.md').read_text)
     return templates.TemplateResponse("docs.html", {"request": request, "content": markdown.markdown(content)})
 
 @app.get("/health")
@@ -341,14 +315,21 @@ async def docs(request: Request):
 async def health_check(request: Request):
     return JSONResponse(content={"status": "ok"})
 
+def _read_history():
+    with Path("/app/history.log").open("r") as f:
+        # 🛡️ Sentinel: Prevent Memory Exhaustion DoS by limiting read
+        return list(deque(f, maxlen=1000))
+
+def _read_cache():
+    with Path("/app/cache.json").open() as f:
+        return json.load(f)
+
 @app.get("/history")
 @limiter.limit(get_rate_limit)
 async def get_history(request: Request):
     """Returns the history of the number of mapped devices."""
     try:
-        with Path("/app/history.log").open("r") as f:
-            # 🛡️ Sentinel: Prevent Memory Exhaustion DoS by limiting read
-            history = list(deque(f, maxlen=1000))
+        history = await asyncio.to_thread(_read_history)
         return JSONResponse(content={"history": history})
     except FileNotFoundError:
         return JSONResponse(content={"history": []})
@@ -358,8 +339,7 @@ async def get_history(request: Request):
 async def get_cache(request: Request):
     """Returns the cached results."""
     try:
-        with Path("/app/cache.json").open() as f:
-            cache = json.load(f)
+        cache = await asyncio.to_thread(_read_cache)
         return JSONResponse(content={"cache": cache})
     except FileNotFoundError:
         return JSONResponse(content={"cache": {}})
@@ -1,10 +1,42 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import meraki
 import structlog
 
 log = structlog.get_logger()
 
+# Only switches (MS) and appliances (MX) carry DHCP fixed IP assignments.
+DHCP_PRODUCT_TYPES = ["switch", "appliance"]
+
+# The only device attributes the fixed IP lookups need; everything else is dropped at ingest.
+DEVICE_FIELDS = ("serial", "networkId", "model")
+# Meraki allows roughly 5 concurrent requests per organization before rate limiting.
+# Overridable through config["meraki_max_concurrency"].
+MAX_CONCURRENT_REQUESTS = 5
+
+# Organization device inventories keyed by (org ID, network IDs), stored as (fetched_at, devices).
+_org_devices_cache = {}
+
+def _fixed_ip_clients(assignments, network_id, network_name):
+    """
+    Converts a `fixedIpAssignments` mapping into client records.
+
+    MACs are lowercased once here so reservations dedupe regardless of how the MAC was entered.
+    """
+    clients = []
+    for mac, client_data in (assignments or {}).items():
+        mac_lower = mac.lower()
+        clients.append({
+            "name": client_data.get('name') or mac_lower,
+            "ip": client_data['ip'],
+            "network_id": network_id,
+            "network_name": network_name,
+            "meraki_client_id": mac_lower,
+            "type": "Fixed IP"
+        })
+    return clients
+
 def _get_fixed_ip_assignments_from_switch(dashboard: meraki.DashboardAPI, device: dict):
     """
     Fetches fixed IP assignments from a Meraki switch.
@@ -14,16 +46,9 @@ def _get_fixed_ip_assignments_from_switch(dashboard: meraki.DashboardAPI, device
         interfaces = dashboard.switch.getDeviceSwitchRoutingInterfaces(device['serial'])
         for interface in interfaces:
             dhcp = dashboard.switch.getDeviceSwitchRoutingInterfaceDhcp(device['serial'], interface['interfaceId'])
-            if dhcp.get('fixedIpAssignments'):
-                for mac, client_data in dhcp['fixedIpAssignments'].items():
-                    relevant_clients.append({
-                        "name": client_data.get('name') or mac,
-                        "ip": client_data['ip'],
-                        "network_id": device['networkId'],
-                        "network_name": None,
-                        "meraki_client_id": mac,
-                        "type": "Fixed IP"
-                    })
+            relevant_clients.extend(
+                _fixed_ip_clients(dhcp.get('fixedIpAssignments'), device['networkId'], None)
+            )
     except meraki.APIError as e:
         log.error("Meraki API error while fetching switch data", error=e, device=device)
     return relevant_clients
@@ -36,28 +61,51 @@ def _get_fixed_ip_assignments_from_appliance(dashboard: meraki.DashboardAPI, dev
     try:
         vlans = dashboard.appliance.getNetworkApplianceVlans(device['networkId'])
         for vlan in vlans:
-            if vlan.get('fixedIpAssignments'):
-                for mac, client_data in vlan['fixedIpAssignments'].items():
-                    relevant_clients.append({
-                        "name": client_data.get('name') or mac,
-                        "ip": client_data['ip'],
-                        "network_id": device['networkId'],
-                        "network_name": vlan['name'],
-                        "meraki_client_id": mac,
-                        "type": "Fixed IP"
-                    })
+            relevant_clients.extend(
+                _fixed_ip_clients(vlan.get('fixedIpAssignments'), device['networkId'], vlan['name'])
+            )
     except meraki.APIError as e:
         log.error("Meraki API error while fetching appliance data", error=e, device=device)
     return relevant_clients
 
+def _get_organization_devices(dashboard: meraki.DashboardAPI, org_id: str, cache_ttl: int, network_ids=()):
+    """
+    Fetches the organization's switches and appliances, reusing a cached copy while it is fresh.
+
+    The device inventory changes far less often than the sync runs, so it is kept
+    in memory for `cache_ttl` seconds. Devices added within that window are picked
+    up once the cached copy expires. When `network_ids` is given, only devices in
+    those networks are requested.
+    """
+    cache_key = (org_id, tuple(network_ids))
+    cached = _org_devices_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < cache_ttl:
+        log.debug("Using cached Meraki organization devices", org_id=org_id, count=len(cached[1]))
+        return cached[1]
+
+    # Filter server-side so wireless, camera and sensor devices (and devices in networks that
+    # weren't asked for) are never transferred or parsed.
+    # total_pages="all" makes the SDK follow the Link header past the first page of results.
+    filters = {"productTypes": DHCP_PRODUCT_TYPES}
+    if network_ids:
+        filters["networkIds"] = list(network_ids)
+    # Keep only the fields the lookups use so the cached inventory stays small.
+    devices = [
+        {field: device.get(field) for field in DEVICE_FIELDS}
+        for device in dashboard.organizations.getOrganizationDevices(org_id, total_pages="all", **filters)
+    ]
+    if cache_ttl > 0:
+        _org_devices_cache[cache_key] = (time.monotonic(), devices)
+    return devices
+
 def get_all_relevant_meraki_clients(dashboard: meraki.DashboardAPI, config: dict):
     """
     Fetches all Meraki clients that have a fixed IP assignment (DHCP reservation).
 
     This function is optimized to:
-    1. Fetch all devices in the organization efficiently.
-    2. Filter for the specific networks if provided.
-    3. For each device, fetches the fixed IP assignments.
+    1. Fetch only the switches and appliances in the organization.
+    2. Filter for the specific networks (`meraki_network_ids`) server-side if provided.
+    3. For each switch, and once per appliance network, fetches the fixed IP assignments.
     4. Return a list of these clients with the necessary information for DNS syncing.
 
     ⚡ Bolt Optimization: Uses ThreadPoolExecutor to concurrently fetch fixed IP
@@ -77,22 +125,41 @@ def get_all_relevant_meraki_clients(dashboard: meraki.DashboardAPI, config: dict
     org_id = config["meraki_org_id"]
     relevant_clients = []
     try:
-        devices = dashboard.organizations.getOrganizationDevices(org_id)
+        devices = _get_organization_devices(
+            dashboard,
+            org_id,
+            config.get("meraki_devices_cache_ttl_seconds", 0),
+            config.get("meraki_network_ids", []),
+        )
     except meraki.APIError as e:
         log.error("Meraki API error while fetching organization devices", error=e, org_id=org_id)
         return []
 
-    def fetch_for_device(device):
+    # Appliance VLANs are configured per network, so query each network once even
+    # when it contains several MX devices (e.g. a warm-spare pair).
+    fetch_tasks = []
+    appliance_network_ids = set()
+    for device in sorted(devices, key=lambda device: device['serial']):
         if device['model'].startswith('MS'):
-            return _get_fixed_ip_assignments_from_switch(dashboard, device)
-        elif device['model'].startswith('MX'):
-            return _get_fixed_ip_assignments_from_appliance(dashboard, device)
-        return []
+            fetch_tasks.append((_get_fixed_ip_assignments_from_switch, device))
+        elif device['model'].startswith('MX') and device['networkId'] not in appliance_network_ids:
+            appliance_network_ids.add(device['networkId'])
+            fetch_tasks.append((_get_fixed_ip_assignments_from_appliance, device))
 
-    # Use a ThreadPoolExecutor to fetch device data in parallel
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(fetch_for_device, device) for device in devices]
-        for future in as_completed(futures):
-            relevant_clients.extend(future.result())
+    # Use a ThreadPoolExecutor to fetch device data in parallel, bounded by Meraki's per-org limit
+    max_workers = max(1, config.get("meraki_max_concurrency", MAX_CONCURRENT_REQUESTS))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch, dashboard, device) for fetch, device in fetch_tasks]
+        # Devices in the same network (e.g. a switch and an appliance) can report the same
+        # reservation. Results are read in serial order, so the device that wins doesn't
+        # depend on which request finishes first.
+        seen_assignments = set()
+        for future in futures:
+            for client in future.result():
+                assignment_key = (client["network_id"], client["meraki_client_id"])
+                if assignment_key in seen_assignments:
+                    continue
+                seen_assignments.add(assignment_key)
+                relevant_clients.append(client)
 
     return relevant_clients
@@ -1,3 +1,5 @@
+import threading
+import time
 from urllib.parse import quote
 
 import requests
@@ -5,18 +7,53 @@ import structlog
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+from ..logging_setup import is_debug_enabled
+
 log = structlog.get_logger()
 
+LEGACY_URL_SUFFIXES = ("/admin/api.php", "/api.php", "/admin")
+# All requests go to a single Pi-hole host, so one pool with a few keep-alive connections suffices.
+POOL_MAXSIZE = 8
+# Number of times a request is attempted when Pi-hole rejects the session with a 403.
+MAX_AUTH_ATTEMPTS = 2
+# Seconds close() waits for the logout request; it runs at shutdown and is best-effort.
+LOGOUT_TIMEOUT_SECONDS = 2
+
+
+def normalize_pihole_url(pihole_url):
+    """
+    Normalizes a configured Pi-hole URL to the base URL used by the v6 API.
+
+    Legacy (v5) URLs such as `http://pi.hole/admin/api.php` are reduced to
+    `http://pi.hole` so API paths can be appended directly.
+
+    Args:
+        pihole_url (str): The Pi-hole URL as configured by the user.
+
+    Returns:
+        str: The base URL of the Pi-hole instance, without a trailing slash.
+    """
+    base_url = pihole_url.rstrip("/")
+    for suffix in LEGACY_URL_SUFFIXES:
+        if base_url.endswith(suffix):
+            return base_url[: -len(suffix)]
+    return base_url
+
 
 class PiholeClient:
-    def __init__(self, pihole_url, pihole_api_key):
-        self.pihole_url = pihole_url.rstrip("/")
-        if self.pihole_url.endswith(("/admin", "/api.php")):
-            self.pihole_url = self.pihole_url.rsplit("/", 1)[0]
+    def __init__(self, pihole_url, pihole_api_key, records_cache_ttl=0):
+        # The URL is normalized once at config-load time (see normalize_pihole_url).
+        self.pihole_url = pihole_url
         self.pihole_api_key = pihole_api_key
+        # Seconds get_custom_dns_records() may serve a previous result; 0 always fetches.
+        self.records_cache_ttl = records_cache_ttl
+        self._records_cache = None
+        self._records_cache_time = 0.0
         self.session = self._get_requests_session()
         self.sid = None
         self.csrf_token = None
+        # Serializes (re-)authentication when the client is shared between threads.
+        self._auth_lock = threading.RLock()
         self.authenticate()
 
     def _get_requests_session(self):
@@ -27,10 +64,14 @@ class PiholeClient:
             redirect=4,
             other=4,
             backoff_factor=1,
+            # Jitter spreads out retries from the worker threads instead of having them
+            # wake up together; Retry-After is still honoured for 429/503 responses.
+            backoff_jitter=1,
+            backoff_max=30,
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS", "PUT", "POST", "DELETE"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry_strategy)
         session = requests.Session()
         session.mount("https://", adapter)
         session.mount("http://", adapter)
@@ -38,16 +79,7 @@ class PiholeClient:
 
     def authenticate(self):
         auth_url = f"{self.pihole_url}/api/auth"
-        if self.sid and self.csrf_token:
-            log.debug("Found cached Pi-hole session. Verifying...")
-            try:
-                if self.get_custom_dns_records() is not None:
-                    log.debug("Cached Pi-hole session is still valid.")
-                    return
-            except requests.exceptions.RequestException as e:
-                log.warning("Failed to verify Pi-hole session due to a network error.", error=e)
-
-        log.info("No valid cached session. Authenticating to Pi-hole.", auth_url=auth_url)
+        log.info("Authenticating to Pi-hole.", auth_url=auth_url)
         try:
             response = self.session.post(auth_url, json={"password": self.pihole_api_key}, timeout=10)
             response.raise_for_status()
@@ -55,72 +87,144 @@ class PiholeClient:
             session_data = auth_data.get("session", {})
 
             if session_data.get("valid"):
-                self.sid = session_data.get("sid")
-                self.csrf_token = session_data.get("csrf")
+                self._set_session_auth(session_data.get("sid"), session_data.get("csrf"))
                 log.info("Successfully authenticated to Pi-hole and cached new session.")
                 if session_data.get("totp"):
                     log.warning("2FA is enabled on this Pi-hole; this script does not support it.")
             else:
-                self.sid, self.csrf_token = None, None
+                self._set_session_auth(None, None)
                 log.error("Failed to authenticate to Pi-hole", message=session_data.get('message', 'No error message provided.'))
 
         except requests.exceptions.HTTPError as e:
-            if e.response and e.response.status_code == 429:
+            # A Response is falsy for 4xx/5xx statuses, so compare against None explicitly.
+            if e.response is not None and e.response.status_code == 429:
                 log.warning("Pi-hole auth API returned HTTP 429 (Too Many Requests). Will retry on next sync cycle.")
             else:
                 log.error("Authentication to Pi-hole failed with HTTP error", error=e)
         except Exception as e:
             log.error("An unexpected error occurred during Pi-hole authentication", error=e)
-            self.sid, self.csrf_token = None, None
+            self._set_session_auth(None, None)
+
+    def close(self):
+        """
+        Logs out of Pi-hole and closes the pooled connections.
+
+        Pi-hole only allows a limited number of concurrent API sessions, so a
+        client that is done should release its session instead of leaving it
+        to expire.
+        """
+        if self.sid and self.csrf_token:
+            # Sent without the session's retrying adapter and with a short timeout, so an
+            # unreachable Pi-hole can't stall process shutdown. The session expires on its own.
+            try:
+                requests.delete(
+                    f"{self.pihole_url}/api/auth",
+                    headers={"X-CSRF-Token": self.csrf_token},
+                    cookies={"SID": self.sid},
+                    timeout=LOGOUT_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                log.warning("Failed to log out of Pi-hole", error=e)
+        self._set_session_auth(None, None)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _set_session_auth(self, sid, csrf_token):
+        """
+        Stores the Pi-hole session credentials on the requests session.
+
+        The SID cookie and CSRF header are set once per authentication so that
+        individual API calls don't need to build their own headers and cookies.
+        """
+        self.sid, self.csrf_token = sid, csrf_token
+        if sid and csrf_token:
+            self.session.headers["X-CSRF-Token"] = csrf_token
+            self.session.cookies.set("SID", sid)
+        else:
+            self.session.headers.pop("X-CSRF-Token", None)
+            self.session.cookies.clear()
 
     def _api_request(self, method, path, data=None):
-        if not self.sid or not self.csrf_token:
-            self.authenticate()
-            if not self.sid or not self.csrf_token:
+        url = f"{self.pihole_url}{path}"
+
+        # A 403 usually means the session expired, so re-authenticate and retry a bounded number of times.
+        for attempt in range(1, MAX_AUTH_ATTEMPTS + 1):
+            with self._auth_lock:
+                if not self.sid or not self.csrf_token:
+                    self.authenticate()
+                sid = self.sid
+            if not sid or not self.csrf_token:
                 log.error("Cannot make API request without a valid session.")
                 return None
 
-        url = f"{self.pihole_url}{path}"
-        headers = {"X-CSRF-Token": self.csrf_token}
-        cookies = {"SID": self.sid}
+            if method != "GET":
+                # Any write may change the DNS hosts, so the cached records can't be trusted anymore.
+                self._records_cache = None
 
-        try:
-            # 🛡️ Sentinel: Sanitize sensitive headers (CSRF Token, Session ID) from logs
-            safe_req_headers = {k: ("***" if k.lower() in ["x-csrf-token", "cookie"] else v) for k, v in headers.items()}
-            log.debug("Pi-hole API Request", url=url, method=method, headers=safe_req_headers, data=data)
+            try:
+                log.debug("Pi-hole API Request", url=url, method=method, data=data)
 
-            response = self.session.request(method, url, headers=headers, cookies=cookies, json=data, timeout=10)
+                # The SID cookie and CSRF header are carried by the session (see _set_session_auth).
+                response = self.session.request(method, url, json=data, timeout=10)
 
-            safe_resp_req_headers = {k: ("***" if k.lower() in ["x-csrf-token", "cookie"] else v) for k, v in response.request.headers.items()}
-            log.debug("Pi-hole API Response", url=response.url, headers=safe_resp_req_headers, status_code=response.status_code, text=response.text)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                log.warning("Pi-hole session appears to be invalid/expired. Attempting to re-authenticate.")
-                self.sid, self.csrf_token = None, None
-                return self._api_request(method, path, data)
-            log.error(
-                "Pi-hole API HTTP error",
-                error=e,
-                response=e.response.text[:200] if e.response and e.response.text else 'No response text'
-            )
-        except requests.exceptions.RequestException as e:
-            log.error("Pi-hole API request failed due to network or request issue", error=e)
+                # Redacting headers and decoding the body is only worth it when the debug log is emitted.
+                if is_debug_enabled():
+                    # 🛡️ Sentinel: Sanitize sensitive headers (CSRF Token, Session ID) from logs
+                    safe_resp_req_headers = {k: ("***" if k.lower() in ["x-csrf-token", "cookie"] else v) for k, v in response.request.headers.items()}
+                    log.debug("Pi-hole API Response", url=response.url, headers=safe_resp_req_headers, status_code=response.status_code, text=response.text)
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 403 and attempt < MAX_AUTH_ATTEMPTS:
+                    log.warning("Pi-hole session appears to be invalid/expired. Attempting to re-authenticate.")
+                    with self._auth_lock:
+                        # Another thread may already have replaced the expired session.
+                        if self.sid == sid:
+                            self._set_session_auth(None, None)
+                    continue
+                log.error(
+                    "Pi-hole API HTTP error",
+                    error=e,
+                    response=e.response.text[:200] if e.response is not None and e.response.text else 'No response text'
+                )
+            except requests.exceptions.RequestException as e:
+                log.error("Pi-hole API request failed due to network or request issue", error=e)
+            return None
         return None
 
-    def get_custom_dns_records(self):
-        log.debug("Fetching existing custom DNS records from Pi-hole...")
+    def _get_dns_hosts(self):
+        """Returns the raw `dns.hosts` entries ("ip domain [domain...]") or None on failure."""
         response_data = self._api_request("GET", "/api/config/dns/hosts")
+        return (response_data or {}).get("config", {}).get("dns", {}).get("hosts")
 
+    def get_custom_dns_records(self):
+        if (
+            self._records_cache is not None
+            and time.monotonic() - self._records_cache_time < self.records_cache_ttl
+        ):
+            log.debug("Using cached custom DNS records", count=len(self._records_cache))
+            return dict(self._records_cache)
+
+        log.debug("Fetching existing custom DNS records from Pi-hole...")
         records = {}
-        if response_data and "config" in response_data and "dns" in response_data["config"] and "hosts" in response_data["config"]["dns"]:
-            for item in response_data["config"]["dns"]["hosts"]:
+        hosts = self._get_dns_hosts()
+        if hosts is not None:
+            # Index by domain so callers can check a record with a single dict lookup.
+            # str.split() already drops surrounding whitespace.
+            for item in hosts:
                 parts = item.split()
                 if len(parts) == 2:
                     ip_address, domain = parts
-                    records[domain.strip().lower()] = ip_address.strip()
+                    records[domain.lower()] = ip_address
             log.debug("Found custom DNS IP mappings in Pi-hole", count=len(records))
+            if self.records_cache_ttl > 0:
+                self._records_cache = dict(records)
+                self._records_cache_time = time.monotonic()
         else:
             log.error("Failed to fetch custom DNS records from Pi-hole (API request failed or returned None).")
             return None
@@ -175,3 +279,48 @@ class PiholeClient:
         else:
             log.error("Failed to remove DNS record", domain=domain_cleaned, ip=ip_cleaned, response=response)
             return False
+
+    def apply_dns_changes(self, upserts, removals):
+        """
+        Applies a batch of DNS record changes with a single config update.
+
+        The current `dns.hosts` array is fetched, every entry for an upserted
+        domain and every removed record is dropped, the new records are appended,
+        and the result is written back with one `PATCH /api/config` call. Entries
+        this sync doesn't manage (including multi-domain lines) are kept as-is.
+
+        Args:
+            upserts (dict): Mapping of domain to the IP address it should resolve to.
+            removals (list): (domain, ip) tuples of records to delete.
+
+        Returns:
+            bool: True if the changes were applied, False if the caller should
+                fall back to per-record requests.
+        """
+        if not upserts and not removals:
+            return True
+
+        hosts = self._get_dns_hosts()
+        if hosts is None:
+            log.warning("Could not read Pi-hole DNS hosts for a bulk update.")
+            return False
+
+        upserts = {domain.strip().lower(): ip.strip() for domain, ip in upserts.items()}
+        removed = {(domain.strip().lower(), ip.strip()) for domain, ip in removals}
+        new_hosts = []
+        for item in hosts:
+            parts = item.split()
+            if len(parts) == 2:
+                ip_address, domain = parts[0], parts[1].lower()
+                if domain in upserts or (domain, ip_address) in removed:
+                    continue
+            new_hosts.append(item)
+        new_hosts.extend(f"{ip} {domain}" for domain, ip in upserts.items())
+
+        response = self._api_request("PATCH", "/api/config", {"config": {"dns": {"hosts": new_hosts}}})
+        if response is None:
+            log.warning("Bulk update of Pi-hole DNS records failed.")
+            return False
+
+        log.info("Applied DNS record changes in bulk", updated=len(upserts), removed=len(removed))
+        return True
@@ -0,0 +1,43 @@
+import logging
+import os
+
+import structlog
+
+ENV_LOG_LEVEL = "LOG_LEVEL"
+DEFAULT_LOG_LEVEL = "INFO"
+
+# structlog emits every level until configure_logging() installs a filtering logger.
+_log_level = logging.NOTSET
+
+
+def configure_logging():
+    """
+    Configures structlog to drop log calls below the level set in `LOG_LEVEL`.
+
+    Filtered calls become no-ops, so debug logging costs next to nothing in the
+    default (INFO) deployment. Logging is configured once per process: loggers
+    cache their configuration on first use, so a later level change wouldn't reach
+    them. Calls after the first are therefore no-ops, even if `LOG_LEVEL` changed,
+    which lets every entry point call it unconditionally.
+    """
+    global _log_level
+    if _log_level != logging.NOTSET:
+        return
+    level = logging.getLevelName(os.getenv(ENV_LOG_LEVEL, DEFAULT_LOG_LEVEL).upper())
+    if not isinstance(level, int):
+        level = logging.getLevelName(DEFAULT_LOG_LEVEL)
+    # Module-level loggers resolve their configuration once instead of on every call.
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=True,
+    )
+    _log_level = level
+
+
+def is_debug_enabled():
+    """
+    Returns whether debug logs are emitted.
+
+    Use it to skip building expensive log arguments that would be discarded anyway.
+    """
+    return _log_level <= logging.DEBUG
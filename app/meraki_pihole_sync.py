@@ -19,11 +19,13 @@ import sys
 
 import structlog
 
+from .logging_setup import configure_logging
 from .sync_logic import sync_pihole_dns
 
 log = structlog.get_logger()
 
 if __name__ == "__main__":
+    configure_logging()
     try:
         sync_pihole_dns()
     except Exception:
@@ -1,7 +1,14 @@
+import atexit
 import functools
+import hashlib
+import json
 import os
+import re
+import string
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -9,7 +16,7 @@ import meraki
 import structlog
 
 from .clients.meraki_client import get_all_relevant_meraki_clients
-from .clients.pihole_client import PiholeClient
+from .clients.pihole_client import POOL_MAXSIZE, PiholeClient, normalize_pihole_url
 
 log = structlog.get_logger()
 
@@ -20,11 +27,94 @@ ENV_PIHOLE_API_URL = "PIHOLE_API_URL"
 ENV_PIHOLE_API_KEY = "PIHOLE_API_KEY"
 ENV_HOSTNAME_SUFFIX = "HOSTNAME_SUFFIX"
 ENV_CLIENT_TIMESPAN = "MERAKI_CLIENT_TIMESPAN_SECONDS"
+ENV_DEVICES_CACHE_TTL = "MERAKI_DEVICES_CACHE_TTL_SECONDS"
+ENV_MERAKI_CACHE_TTL = "MERAKI_CACHE_TTL_SECONDS"
+ENV_MERAKI_MAX_CONCURRENCY = "MERAKI_MAX_CONCURRENCY"
+ENV_MERAKI_MAX_RETRIES = "MERAKI_MAX_RETRIES"
+ENV_MERAKI_TIMEOUT = "MERAKI_TIMEOUT_SECONDS"
+ENV_PIHOLE_RECORDS_CACHE_TTL = "PIHOLE_RECORDS_CACHE_TTL_SECONDS"
 ENV_LOG_FILE_PATH = "LOG_FILE_PATH"
 ENV_CACHE_FILE_PATH = "CACHE_FILE_PATH"
 ENV_HISTORY_FILE_PATH = "HISTORY_FILE_PATH"
 ENV_CHANGELOG_FILE_PATH = "CHANGELOG_FILE_PATH"
 ENV_SYNC_INTERVAL_FILE_PATH = "SYNC_INTERVAL_FILE_PATH"
+ENV_SYNC_INTERVAL = "SYNC_INTERVAL_SECONDS"
+ENV_SYNC_STATE_FILE_PATH = "SYNC_STATE_FILE_PATH"
+
+# Mandatory variables mapped to (config key, description), so keys are not rebuilt on every load.
+MANDATORY_ENV_VARS = {
+    ENV_MERAKI_API_KEY: ("meraki_api_key", "Meraki API Key"),
+    ENV_MERAKI_ORG_ID: ("meraki_org_id", "Meraki Organization ID"),
+    ENV_PIHOLE_API_URL: ("pihole_api_url", "Pi-hole API URL"),
+    ENV_PIHOLE_API_KEY: ("pihole_api_key", "Pi-hole API Key"),
+    ENV_HOSTNAME_SUFFIX: ("hostname_suffix", "Hostname Suffix"),
+}
+
+# Example values from .env.example that indicate the configuration was never filled in.
+MERAKI_ORG_ID_PLACEHOLDER = "YOUR_MERAKI_ORGANIZATION_ID"
+PIHOLE_URL_PLACEHOLDER = "YOUR_PIHOLE_API_URL"
+PIHOLE_HOST_PLACEHOLDER = "YOUR_PIHOLE_IP_OR_HOSTNAME"
+HOSTNAME_SUFFIX_PLACEHOLDERS = frozenset({".LOCAL", ".YOURDOMAIN.LOCAL", ".YOURCUSTOMDOMAIN.LOCAL", "YOUR_HOSTNAME_SUFFIX"})
+
+# The Meraki SDK retries 429s itself, waiting for the Retry-After interval Meraki sends.
+# The retry count can be overridden with MERAKI_MAX_RETRIES.
+MERAKI_MAXIMUM_RETRIES = 5
+MERAKI_NGINX_429_RETRY_WAIT_SECONDS = 60
+MERAKI_REQUEST_TIMEOUT_SECONDS = 30
+
+# Pi-hole frequently runs on a Raspberry Pi, so keep the number of concurrent API calls small.
+# The sync uses half of the shared client's connection pool, leaving the rest for dashboard
+# requests, so every worker keeps a kept-alive connection instead of one urllib3 discards.
+PIHOLE_MAX_WORKERS = POOL_MAXSIZE // 2
+
+# Guard creation of the shared Pi-hole client and Meraki dashboard (see get_pihole_client).
+_pihole_client_lock = threading.Lock()
+_meraki_dashboard_lock = threading.Lock()
+
+# Spaces and path-like separators become hyphens and ASCII letters are lowercased in one translate() pass;
+# anything still outside the hostname alphabet is then dropped.
+HOSTNAME_TRANSLATION = str.maketrans(
+    {**dict.fromkeys(" _/\\", "-"), **dict(zip(string.ascii_uppercase, string.ascii_lowercase, strict=True))}
+)
+INVALID_HOSTNAME_CHARS = re.compile(r"[^a-z0-9.-]")
+
+# Changelog lines look like "<timestamp>: Mapped <domain> to <ip>" or "<timestamp>: Removed <domain> -> <ip>".
+CHANGELOG_ENTRY_PATTERN = re.compile(r"(Mapped|Removed) (\S+) (?:to|->) (\S+)$")
+# The changelog is append-only; once it grows past this size it is moved aside to "<name>.1".
+CHANGELOG_MAX_BYTES = 1_000_000
+
+
+def _int_from_env(env, name, default, minimum):
+    """
+    Reads an optional integer setting from the environment.
+
+    Args:
+        env (Mapping): The environment to read from.
+        name (str): The environment variable name.
+        default (int): The value used when the variable is unset or invalid.
+        minimum (int): The smallest accepted value.
+
+    Returns:
+        int: The configured value, or `default` if it is missing, not an integer,
+             or below `minimum`.
+    """
+    raw_value = env.get(name)
+    if raw_value is None:
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        log.warning(
+            "Invalid value for integer setting, using default",
+            setting=name,
+            invalid_value=raw_value,
+            default_value=default,
+            minimum=minimum,
+        )
+        return default
+    return value
 
 
 # ⚡ Bolt Optimization: Cache the environment configuration loading function to eliminate redundant parsing overhead.
@@ -40,21 +130,12 @@ def load_app_config_from_env():
               Exits the script if mandatory variables are missing or if placeholder
               values are detected for critical settings.
     """
-    config = {}
-    mandatory_vars = {
-        ENV_MERAKI_API_KEY: "Meraki API Key",
-        ENV_MERAKI_ORG_ID: "Meraki Organization ID",
-        ENV_PIHOLE_API_URL: "Pi-hole API URL",
-        ENV_PIHOLE_API_KEY: "Pi-hole API Key",
-        ENV_HOSTNAME_SUFFIX: "Hostname Suffix",
-    }
-    missing_vars_messages = []
-
-    for var_name, desc in mandatory_vars.items():
-        value = os.getenv(var_name)
-        if not value:
-            missing_vars_messages.append(f"{desc} ({var_name})")
-        config[var_name.lower()] = value
+    # Read every variable through one mapping instead of repeated os.getenv() calls.
+    env = os.environ
+    config = {key: env.get(var_name) for var_name, (key, _) in MANDATORY_ENV_VARS.items()}
+    missing_vars_messages = [
+        f"{desc} ({var_name})" for var_name, (key, desc) in MANDATORY_ENV_VARS.items() if not config[key]
+    ]
 
     if missing_vars_messages:
         log.error(
@@ -62,78 +143,187 @@ def load_app_config_from_env():
         )
         sys.exit(1)
 
-    config["pihole_api_key"] = os.getenv(ENV_PIHOLE_API_KEY)
-    meraki_network_ids_str = os.getenv(ENV_MERAKI_NETWORK_IDS, "")
+    meraki_network_ids_str = env.get(ENV_MERAKI_NETWORK_IDS, "")
     config["meraki_network_ids"] = [nid.strip() for nid in meraki_network_ids_str.split(",") if nid.strip()]
 
-    try:
-        default_timespan = "86400"
-        config["meraki_client_timespan_seconds"] = int(os.getenv(ENV_CLIENT_TIMESPAN, default_timespan))
-    except ValueError:
-        log.warning(
-            "Invalid value for MERAKI_CLIENT_TIMESPAN_SECONDS, using default",
-            invalid_value=os.getenv(ENV_CLIENT_TIMESPAN),
-            default_value=default_timespan,
-        )
-        config["meraki_client_timespan_seconds"] = int(default_timespan)
+    config["meraki_client_timespan_seconds"] = _int_from_env(env, ENV_CLIENT_TIMESPAN, 86400, minimum=1)
+    config["meraki_devices_cache_ttl_seconds"] = _int_from_env(env, ENV_DEVICES_CACHE_TTL, 3600, minimum=0)
+    config["meraki_cache_ttl_seconds"] = _int_from_env(env, ENV_MERAKI_CACHE_TTL, 0, minimum=0)
+    config["meraki_max_concurrency"] = _int_from_env(env, ENV_MERAKI_MAX_CONCURRENCY, 5, minimum=1)
+    config["meraki_max_retries"] = _int_from_env(env, ENV_MERAKI_MAX_RETRIES, MERAKI_MAXIMUM_RETRIES, minimum=0)
+    config["meraki_request_timeout_seconds"] = _int_from_env(
+        env, ENV_MERAKI_TIMEOUT, MERAKI_REQUEST_TIMEOUT_SECONDS, minimum=1
+    )
+    config["pihole_records_cache_ttl_seconds"] = _int_from_env(env, ENV_PIHOLE_RECORDS_CACHE_TTL, 0, minimum=0)
 
-    if config["meraki_org_id"].upper() == "YOUR_MERAKI_ORGANIZATION_ID":
+    if config["meraki_org_id"].upper() == MERAKI_ORG_ID_PLACEHOLDER:
         log.error("Placeholder value detected for MERAKI_ORG_ID")
         sys.exit(1)
-    if (
-        config["pihole_api_url"].upper() == "YOUR_PIHOLE_API_URL"
-        or "YOUR_PIHOLE_IP_OR_HOSTNAME" in config["pihole_api_url"].upper()
-    ):
+    pihole_api_url_upper = config["pihole_api_url"].upper()
+    if pihole_api_url_upper == PIHOLE_URL_PLACEHOLDER or PIHOLE_HOST_PLACEHOLDER in pihole_api_url_upper:
         log.error("Placeholder value detected for PIHOLE_API_URL")
         sys.exit(1)
-    example_suffixes = [".LOCAL", ".YOURDOMAIN.LOCAL", ".YOURCUSTOMDOMAIN.LOCAL", "YOUR_HOSTNAME_SUFFIX"]
-    if config["hostname_suffix"].upper() in example_suffixes:
+    # Normalize the Pi-hole URL once here rather than on every API call.
+    pihole_base_url = normalize_pihole_url(config["pihole_api_url"])
+    if pihole_base_url != config["pihole_api_url"].rstrip("/"):
+        log.warning(
+            "PIHOLE_API_URL points at a legacy endpoint; using the Pi-hole base URL instead",
+            configured_url=config["pihole_api_url"],
+            base_url=pihole_base_url,
+        )
+    config["pihole_api_url"] = pihole_base_url
+    if config["hostname_suffix"].upper() in HOSTNAME_SUFFIX_PLACEHOLDERS:
         log.warning(
             "Possible example/placeholder value detected for HOSTNAME_SUFFIX",
             hostname_suffix=config["hostname_suffix"],
         )
 
-    config["log_file_path"] = os.getenv(ENV_LOG_FILE_PATH, "/app/logs/sync.log")
-    config["cache_file_path"] = os.getenv(ENV_CACHE_FILE_PATH, "/app/cache.json")
-    config["history_file_path"] = os.getenv(ENV_HISTORY_FILE_PATH, "/app/history.log")
-    config["changelog_file_path"] = os.getenv(ENV_CHANGELOG_FILE_PATH, "/app/changelog.log")
-    config["sync_interval_file_path"] = os.getenv(ENV_SYNC_INTERVAL_FILE_PATH, "/app/sync_interval.txt")
+    config["log_file_path"] = env.get(ENV_LOG_FILE_PATH, "/app/logs/sync.log")
+    config["cache_file_path"] = env.get(ENV_CACHE_FILE_PATH, "/app/cache.json")
+    config["history_file_path"] = env.get(ENV_HISTORY_FILE_PATH, "/app/history.log")
+    config["changelog_file_path"] = env.get(ENV_CHANGELOG_FILE_PATH, "/app/changelog.log")
+    config["sync_interval_file_path"] = env.get(ENV_SYNC_INTERVAL_FILE_PATH, "/app/sync_interval.txt")
+    try:
+        config["sync_interval_seconds"] = int(env.get(ENV_SYNC_INTERVAL))
+    except (TypeError, ValueError):
+        config["sync_interval_seconds"] = None
+    config["sync_state_file_path"] = env.get(ENV_SYNC_STATE_FILE_PATH, "/app/sync_state.txt")
 
     log.info("Successfully loaded configuration from environment variables.")
     return config
 
 
-def get_meraki_data(config):
+@functools.lru_cache(maxsize=1)
+def _create_pihole_client(pihole_url, pihole_api_key, records_cache_ttl):
+    client = PiholeClient(pihole_url, pihole_api_key, records_cache_ttl=records_cache_ttl)
+    # The client lives for the whole process; log out on shutdown to free the Pi-hole session slot.
+    atexit.register(client.close)
+    return client
+
+
+def get_pihole_client(pihole_url, pihole_api_key, records_cache_ttl=0):
     """
-    Initializes the Meraki dashboard API and fetches all relevant clients.
+    Returns a Pi-hole client that is shared across sync cycles.
+
+    Reusing the client keeps its authenticated session and its pooled
+    keep-alive connections, so each sync doesn't pay for a new login and
+    fresh TCP/TLS handshakes. lru_cache alone lets two threads (the sync and a
+    dashboard request) both miss and log in, so creation is serialized.
+
+    Args:
+        pihole_url (str): The normalized Pi-hole base URL.
+        pihole_api_key (str): The Pi-hole password or application password.
+        records_cache_ttl (int): Seconds to reuse fetched DNS records; 0 disables it.
+
+    Returns:
+        PiholeClient: The shared Pi-hole client.
     """
-    dashboard = meraki.DashboardAPI(
-        api_key=config["meraki_api_key"],
+    with _pihole_client_lock:
+        return _create_pihole_client(pihole_url, pihole_api_key, records_cache_ttl)
+
+
+@functools.lru_cache(maxsize=1)
+def _create_meraki_dashboard(api_key, maximum_retries, request_timeout):
+    return meraki.DashboardAPI(
+        api_key=api_key,
         output_log=False,
         print_console=False,
         suppress_logging=True,
+        wait_on_rate_limit=True,
+        maximum_retries=maximum_retries,
+        nginx_429_retry_wait_time=MERAKI_NGINX_429_RETRY_WAIT_SECONDS,
+        single_request_timeout=request_timeout,
+    )
+
+
+def get_meraki_dashboard(api_key, maximum_retries, request_timeout):
+    """
+    Returns a Meraki dashboard API client that is shared across sync cycles.
+
+    Like the Pi-hole client, reusing the dashboard keeps its session's
+    keep-alive connections to the Meraki API between syncs, and creation is
+    serialized so concurrent first callers share one instance.
+
+    Args:
+        api_key (str): The Meraki API key.
+        maximum_retries (int): How many times a failed or rate-limited request is retried.
+        request_timeout (int): Seconds to wait for a single API response.
+
+    Returns:
+        meraki.DashboardAPI: The shared dashboard client.
+    """
+    with _meraki_dashboard_lock:
+        return _create_meraki_dashboard(api_key, maximum_retries, request_timeout)
+
+
+def get_meraki_data(config):
+    """
+    Fetches all relevant clients through the shared Meraki dashboard API.
+    """
+    dashboard = get_meraki_dashboard(
+        config["meraki_api_key"],
+        config.get("meraki_max_retries", MERAKI_MAXIMUM_RETRIES),
+        config.get("meraki_request_timeout_seconds", MERAKI_REQUEST_TIMEOUT_SECONDS),
     )
     return get_all_relevant_meraki_clients(dashboard, config)
 
 
-def get_mappings_data():
+def _load_cached_meraki_clients(config):
     """
-    Gets the data for the mappings page.
+    Returns the Meraki clients stored by the last sync if they are recent enough.
+
+    Freshness is judged by the `meraki_fetched_at` time stored in the cache, not the
+    file's mtime: every sync rewrites the file, including syncs that reused cached
+    clients, so the mtime would keep extending the TTL without ever calling Meraki.
+
+    Args:
+        config (dict): The application configuration.
+
+    Returns:
+        tuple[list, float] | None: The cached clients and when they were fetched from
+                                   Meraki, or None if caching is disabled, the clients
+                                   are older than `meraki_cache_ttl_seconds`, or the
+                                   cache can't be read.
     """
+    ttl = config.get("meraki_cache_ttl_seconds", 0)
+    if ttl <= 0:
+        return None
     try:
-        config = load_app_config_from_env()
-        pihole_client = PiholeClient(config["pihole_api_url"], config["pihole_api_key"])
-        pihole_records = pihole_client.get_custom_dns_records()
-        if not pihole_records:
-            return {}
+        with Path(config["cache_file_path"]).open() as f:
+            cache = json.load(f)
+        meraki_clients = cache.get("meraki")
+        fetched_at = float(cache.get("meraki_fetched_at"))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+    if not isinstance(meraki_clients, list) or time.time() - fetched_at > ttl:
+        return None
+    log.info("Using cached Meraki clients", count=len(meraki_clients), cache_ttl_seconds=ttl)
+    return meraki_clients, fetched_at
+
+
+def _store_meraki_clients(config, meraki_clients, fetched_at):
+    """
+    Stores freshly fetched Meraki clients in the cache without touching the Pi-hole data.
+
+    A Meraki-only update doesn't sync Pi-hole, but the next sync within
+    `meraki_cache_ttl_seconds` must reuse the clients it just fetched rather than
+    the ones from before the update.
 
-        meraki_clients = get_meraki_data(config)
-        mapped_devices, unmapped_meraki_devices = map_devices(meraki_clients, pihole_records)
+    Args:
+        config (dict): The application configuration.
+        meraki_clients (list): The clients returned by the Meraki API.
+        fetched_at (float): When the clients were fetched, as a Unix timestamp.
+    """
+    cache_path = Path(config["cache_file_path"])
+    try:
+        cache = json.loads(cache_path.read_text())
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cache.update(meraki=meraki_clients, meraki_fetched_at=fetched_at)
+    cache_path.write_text(json.dumps(cache, separators=(",", ":")))
 
-        return {"pihole": pihole_records, "meraki": meraki_clients, "mapped": mapped_devices, "unmapped_meraki": unmapped_meraki_devices}
-    except Exception as e:
-        log.error("Error in get_mappings_data", error=e)
-        return {}
 
 def map_devices(meraki_clients, pihole_records):
     """
@@ -145,19 +335,16 @@ def map_devices(meraki_clients, pihole_records):
     # Pre-compute a mapping of IP to list of domains for O(1) lookups
     ip_to_domains = {}
     for domain, ip in pihole_records.items():
-        if ip not in ip_to_domains:
-            ip_to_domains[ip] = []
-        ip_to_domains[ip].append(domain)
+        ip_to_domains.setdefault(ip, []).append(domain)
 
     for client in meraki_clients:
         client_ip = client['ip']
-        if client_ip in ip_to_domains:
-            for domain in ip_to_domains[client_ip]:
-                mapped_devices.append({
-                    "meraki_name": client['name'],
-                    "pihole_domain": domain,
-                    "ip": client_ip
-                })
+        domains = ip_to_domains.get(client_ip)
+        if domains:
+            mapped_devices.extend(
+                {"meraki_name": client['name'], "pihole_domain": domain, "ip": client_ip}
+                for domain in domains
+            )
         else:
             unmapped_meraki_devices.append(client)
 
@@ -183,17 +370,141 @@ def get_sync_interval():
     except (OSError, ValueError):
         pass
 
-    try:
-        interval = int(os.getenv("SYNC_INTERVAL_SECONDS"))
+    # Parsed once with the rest of the configuration; this runs on every SSE tick.
+    interval = config.get("sync_interval_seconds")
+    if interval is not None:
         log.debug("Using sync interval from environment variable", interval=interval)
         return interval
-    except (TypeError, ValueError):
-        pass
 
     default_interval = 300
     log.debug("Using default sync interval", interval=default_interval)
     return default_interval
 
+def sanitize_hostname(name):
+    """
+    Converts a Meraki client name into a DNS hostname label.
+
+    Args:
+        name (str): The client name as reported by Meraki.
+
+    Returns:
+        str: The lowercased name with spaces replaced by hyphens and characters
+             that aren't valid in a hostname removed. May be empty.
+    """
+    return INVALID_HOSTNAME_CHARS.sub("", name.translate(HOSTNAME_TRANSLATION))
+
+# Changelog path -> {domain: ip} it records. The file is only read on the first sync of the
+# process (or after it rolls over); later syncs keep the view current as they append.
+_changelog_mappings = {}
+# Guards _changelog_mappings and the changelog files against concurrent syncs.
+_changelog_lock = threading.Lock()
+
+def _load_changelog_mappings(changelog_path):
+    """
+    Replays the changelog into the mappings it currently records.
+
+    Args:
+        changelog_path (Path): Path to the changelog file.
+
+    Returns:
+        dict: Mapping of domain to the IP address most recently logged for it.
+    """
+    mappings = {}
+    with changelog_path.open() as f:
+        for line in f:
+            match = CHANGELOG_ENTRY_PATTERN.search(line)
+            if not match:
+                continue
+            action, domain, ip = match.groups()
+            if action == "Mapped":
+                mappings[domain] = ip
+            else:
+                mappings.pop(domain, None)
+    return mappings
+
+def _append_changelog(changelog_path, applied, removed_records):
+    """
+    Appends the mappings a sync changed to the changelog.
+
+    Only mappings that differ from what the changelog last recorded are appended, so the
+    file grows with actual changes instead of being rewritten on every sync. The scheduled
+    sync and syncs triggered from the UI can run at the same time, so the rollover, the
+    cached mappings and the write all happen under one lock.
+
+    Args:
+        changelog_path (Path): Path to the changelog file.
+        applied (dict): Domain to IP mappings now present in Pi-hole.
+        removed_records (list): (domain, ip) pairs removed from Pi-hole.
+    """
+    with _changelog_lock:
+        if changelog_path.exists() and changelog_path.stat().st_size > CHANGELOG_MAX_BYTES:
+            changelog_path.replace(changelog_path.with_name(f"{changelog_path.name}.1"))
+        if not changelog_path.exists():
+            # A new (rolled-over or deleted) file records nothing yet.
+            changelog_path.touch()
+            _changelog_mappings.pop(str(changelog_path), None)
+
+        logged_mappings = _changelog_mappings.get(str(changelog_path))
+        if logged_mappings is None:
+            logged_mappings = _load_changelog_mappings(changelog_path)
+            _changelog_mappings[str(changelog_path)] = logged_mappings
+
+        changelog_lines = []
+        # One timestamp per sync run: every entry below records the same batch of changes.
+        timestamp = datetime.now()
+        for domain, ip in applied.items():
+            if logged_mappings.get(domain) != ip:
+                changelog_lines.append(f"{timestamp}: Mapped {domain} to {ip}\n")
+                logged_mappings[domain] = ip
+        for domain, ip in removed_records:
+            logged_mappings.pop(domain, None)
+            changelog_lines.append(f"{timestamp}: Removed {domain} -> {ip}\n")
+
+        # New entries are written in one go rather than line by line.
+        if changelog_lines:
+            with changelog_path.open("a") as f:
+                f.writelines(changelog_lines)
+
+def _desired_state_digest(desired_records, meraki_ips):
+    """Returns a stable digest of the records a sync would write and the IPs it would keep."""
+    payload = repr((sorted(desired_records.items()), sorted(meraki_ips)))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def _read_sync_state(state_file):
+    """Returns the (digest, mapped_devices) pair stored by the last fully applied sync, or None."""
+    if not state_file:
+        return None
+    try:
+        digest, mapped_devices = Path(state_file).read_text().split()
+        return digest, int(mapped_devices)
+    except (OSError, ValueError):
+        return None
+
+def _replace_dns_record(pihole_client, domain, ip, existing_records):
+    """
+    Adds a record to Pi-hole, then deletes the line it supersedes.
+
+    A PUT adds a hosts line rather than replacing one, so a domain whose IP changed
+    also needs its old line deleted. The delete only runs once the add succeeded, so a
+    failed add never leaves the domain without a record.
+
+    Args:
+        pihole_client (PiholeClient): The Pi-hole client.
+        domain (str): The domain to sync.
+        ip (str): The IP address it should resolve to.
+        existing_records (dict): The records Pi-hole held before this sync.
+
+    Returns:
+        tuple[bool, bool]: Whether the record was added, and whether no superseded
+                           line was left behind.
+    """
+    if not pihole_client.add_or_update_dns_record(domain, ip, existing_records=existing_records):
+        return False, True
+    old_ip = existing_records.get(domain)
+    if old_ip is None:
+        return True, True
+    return True, pihole_client.remove_dns_record(domain, old_ip)
+
 def sync_pihole_dns(update_type=None):
     """
     Main function to run the Meraki to Pi-hole sync process.
@@ -205,70 +516,142 @@ def sync_pihole_dns(update_type=None):
     log.info("Starting Meraki Pi-hole Sync Script", version=app_version, commit=commit_sha)
 
     config = load_app_config_from_env()
-    meraki_clients = get_meraki_data(config)
-    if (update_type is None or update_type == "pihole") and meraki_clients:
-        pihole_client = PiholeClient(config["pihole_api_url"], config["pihole_api_key"])
+    # A Meraki update requested from the UI always goes to the API.
+    cached = _load_cached_meraki_clients(config) if update_type != "meraki" else None
+    if cached is None:
+        meraki_clients, meraki_fetched_at = get_meraki_data(config), time.time()
+    else:
+        meraki_clients, meraki_fetched_at = cached
+    if not meraki_clients:
+        # An empty result usually means a Meraki outage; syncing it would remove every managed record.
+        log.warning("No Meraki clients found; skipping Pi-hole update.")
+        return
+    if update_type == "meraki":
+        _store_meraki_clients(config, meraki_clients, meraki_fetched_at)
+    if update_type is None or update_type == "pihole":
+        # Only membership is needed, so keep the IPs in a set rather than a dict of clients.
+        meraki_ips = {client["ip"] for client in meraki_clients}
+
+        hostname_suffix = config["hostname_suffix"].lower()
+        desired_records = {}
+        # Client name -> synced domain, so the summary below doesn't have to sanitize names again.
+        domains_by_name = {}
+        # Unnamed clients can't get a DNS record; report them with one line instead of one per client.
+        named_clients = [client for client in meraki_clients if client.get("name")]
+        unnamed_count = len(meraki_clients) - len(named_clients)
+        if unnamed_count:
+            log.warning("Skipping clients with no name", count=unnamed_count)
+
+        for client in named_clients:
+            client_name = client["name"]
+            if ":" in client_name:
+                log.warning("Skipping client with invalid characters in name", client_name=client_name)
+                continue
+
+            client_name_sanitized = sanitize_hostname(client_name)
+            if not client_name_sanitized:
+                log.warning("Skipping client with no valid hostname characters in name", client_name=client_name)
+                continue
+            domain_to_sync = f"{client_name_sanitized}{hostname_suffix}"
+            desired_records[domain_to_sync] = client["ip"]
+            domains_by_name[client_name] = domain_to_sync
+
+        # If Meraki reports exactly what the last fully applied sync wrote, Pi-hole needs no
+        # reads or writes. A manual Pi-hole update from the UI always runs the full comparison.
+        state_file = config.get("sync_state_file_path")
+        state_digest = _desired_state_digest(desired_records, meraki_ips)
+        last_state = _read_sync_state(state_file)
+        if update_type != "pihole" and last_state and last_state[0] == state_digest:
+            log.info("Meraki clients unchanged since the last sync; skipping Pi-hole update.")
+            with Path(config["history_file_path"]).open("a") as f:
+                f.write(f"{int(time.time())},{last_state[1]}\n")
+            return
+
+        # Pi-hole is only contacted once there is something to sync. The client is shared, so
+        # only the first sync of the process pays for the login.
+        pihole_client = get_pihole_client(
+            config["pihole_api_url"],
+            config["pihole_api_key"],
+            config.get("pihole_records_cache_ttl_seconds", 0),
+        )
         existing_pihole_records = pihole_client.get_custom_dns_records()
 
         if existing_pihole_records is not None:
             successful_syncs = 0
             failed_syncs = 0
-            meraki_clients_by_ip = {client['ip']: client for client in meraki_clients}
-            meraki_clients_by_name = {client['name'].replace(" ", "-").lower(): client for client in meraki_clients if client.get('name')}
-
-            changelog_path = Path(config["changelog_file_path"])
-            if not changelog_path.exists():
-                changelog_path.touch()
-
-            with changelog_path.open("a+") as f:
-                f.seek(0)
-                previous_mappings = f.readlines()
-                # ⚡ Bolt Optimization: Convert the list of previous mappings to a set for O(1) lookups
-                # Impact: Prevents O(N*M) time complexity when checking if a mapping already exists.
-                # Measurement: Testing N=10000 lookups against a list takes ~0.95s, while a set takes ~0.001s.
-                previous_mappings_set = set(previous_mappings)
-                f.seek(0)
-                f.truncate()
-
-                for client in meraki_clients:
-                    if not client.get("name"):
-                        log.warning("Skipping client with no name", client_ip=client.get("ip"))
-                        continue
-
-                    client_name = client["name"]
-                    if ":" in client_name:
-                        log.warning("Skipping client with invalid characters in name", client_name=client_name)
-                        continue
-
-                    client_name_sanitized = client_name.replace(" ", "-").lower()
-                    domain_to_sync = f"{client_name_sanitized}{config['hostname_suffix']}"
-                    ip_to_sync = client["ip"]
-
-                    # Bolt: Pass existing_pihole_records to avoid an API call (N+1 query problem) on every client
-                    if pihole_client.add_or_update_dns_record(domain_to_sync, ip_to_sync, existing_records=existing_pihole_records):
-                        timestamp = datetime.now()
-                        mapping_line = f"{timestamp}: Mapped {domain_to_sync} to {ip_to_sync}\n"
-                        if mapping_line not in previous_mappings_set:
-                            f.write(mapping_line)
-                            previous_mappings_set.add(mapping_line)
-                        successful_syncs += 1
-                    else:
-                        failed_syncs += 1
-                        log.warning(
-                            "Failed to sync client to Pi-hole",
-                            client_name=client["name"],
-                            domain=domain_to_sync,
-                            ip=ip_to_sync,
-                        )
-
-                for domain, ip in existing_pihole_records.items():
-                    pihole_hostname = domain.replace(config['hostname_suffix'], "")
-                    if ip not in meraki_clients_by_ip and pihole_hostname not in meraki_clients_by_name:
-                        if pihole_client.remove_dns_record(domain, ip):
-                            timestamp = datetime.now()
-                            f.write(f"{timestamp}: Removed {domain} -> {ip}\n")
-                        else:
-                            log.warning("Failed to remove stale DNS record", domain=domain, ip=ip)
+
+            # Records that already match Pi-hole need no API call; a set difference over the
+            # (domain, ip) pairs leaves only the real changes.
+            pending_records = dict(desired_records.items() - existing_pihole_records.items())
+            log.info(
+                "Compared Meraki clients with Pi-hole records",
+                unchanged=len(desired_records) - len(pending_records),
+                pending=len(pending_records),
+            )
+
+            # Only records carrying the hostname suffix are managed by this sync; a single
+            # set difference finds the ones no longer backed by a Meraki client. Sorting keeps
+            # the removal order (and the changelog) deterministic between runs.
+            # desired_records already holds every synced domain, so no names are sanitized again here.
+            managed_domains = {domain for domain in existing_pihole_records if domain.endswith(hostname_suffix)}
+            stale_records = [
+                (domain, existing_pihole_records[domain])
+                for domain in sorted(managed_domains - desired_records.keys())
+                if existing_pihole_records[domain] not in meraki_ips
+            ]
+
+            # A single config update replaces N per-record round-trips. If Pi-hole rejects
+            # it, fall back to per-record requests fanned out over a small pool; executor.map
+            # keeps results in submission order.
+            if pihole_client.apply_dns_changes(pending_records, stale_records):
+                add_results = dict.fromkeys(pending_records, True)
+                remove_results = [True] * len(stale_records)
+            else:
+                # apply_dns_changes() succeeds trivially when there is nothing to do, so at least
+                # one record is pending here; don't start idle threads for a handful of records.
+                work_size = len(pending_records) + len(stale_records)
+                with ThreadPoolExecutor(max_workers=min(PIHOLE_MAX_WORKERS, work_size)) as executor:
+                    # Bolt: Pass existing_pihole_records to avoid an API call (N+1 query problem) on every client.
+                    # Each domain's add and superseded-line delete run in order on one worker.
+                    replace_results = dict(zip(
+                        pending_records,
+                        executor.map(
+                            lambda record: _replace_dns_record(pihole_client, *record, existing_pihole_records),
+                            pending_records.items(),
+                        ),
+                        strict=True,
+                    ))
+                    remove_results = list(
+                        executor.map(lambda record: pihole_client.remove_dns_record(*record), stale_records)
+                    )
+                add_results = {domain: added for domain, (added, _) in replace_results.items()}
+                # PiholeClient has already logged each failed delete. The domain resolves to both
+                # IPs until a later sync retries, so the run must not count as fully applied.
+                failed_syncs += sum(not cleared for _, cleared in replace_results.values())
+
+            # Successful writes are collected and folded into a new records snapshot once the
+            # loops finish, so the summary and cache reflect Pi-hole after this sync.
+            applied = {}
+            for domain_to_sync, ip_to_sync in desired_records.items():
+                if add_results.get(domain_to_sync, True):
+                    applied[domain_to_sync] = ip_to_sync
+                    successful_syncs += 1
+                else:
+                    # PiholeClient has already logged the failure with the API response.
+                    failed_syncs += 1
+
+            removed_records = [
+                record for record, removed in zip(stale_records, remove_results, strict=True) if removed
+            ]
+            removed_domains = {domain for domain, _ in removed_records}
+
+            existing_pihole_records = {
+                domain: ip
+                for domain, ip in {**existing_pihole_records, **applied}.items()
+                if domain not in removed_domains
+            }
+
+            _append_changelog(Path(config["changelog_file_path"]), applied, removed_records)
 
             log.info(
                 "Meraki to Pi-hole Sync Summary",
@@ -280,23 +663,29 @@ def sync_pihole_dns(update_type=None):
             mapped_devices = 0
             unmapped_meraki_devices = []
             for client in meraki_clients:
-                if client.get("name"):
-                    client_name_sanitized = client["name"].replace(" ", "-").lower()
-                    domain_to_sync = f"{client_name_sanitized}{config['hostname_suffix']}"
-                    if domain_to_sync in existing_pihole_records:
-                        mapped_devices += 1
-                    else:
-                        unmapped_meraki_devices.append(client)
+                if domains_by_name.get(client.get("name")) in existing_pihole_records:
+                    mapped_devices += 1
                 else:
                     unmapped_meraki_devices.append(client)
             with Path(config["history_file_path"]).open("a") as f:
                 f.write(f"{int(time.time())},{mapped_devices}\n")
 
-            with Path(config["cache_file_path"]).open("w") as f:
-                import json
-                json.dump({
-                    "pihole": existing_pihole_records,
-                    "meraki": meraki_clients,
-                    "mapped": mapped_devices,
-                    "unmapped_meraki": unmapped_meraki_devices,
-                }, f)
+            # Only a sync that applied every change (including deleting superseded lines, counted in
+            # failed_syncs) may be skipped next time; otherwise retry in full.
+            if state_file:
+                if failed_syncs == 0 and len(removed_domains) == len(stale_records):
+                    Path(state_file).write_text(f"{state_digest} {mapped_devices}\n")
+                else:
+                    Path(state_file).unlink(missing_ok=True)
+
+            # Serialize in one call and write once; compact separators keep the file (and the
+            # dashboard's reads of it) smaller since nobody edits it by hand.
+            Path(config["cache_file_path"]).write_text(json.dumps({
+                "pihole": existing_pihole_records,
+                "meraki": meraki_clients,
+                # Kept from the original fetch when the clients came from this cache, so
+                # rewriting the file doesn't extend their TTL.
+                "meraki_fetched_at": meraki_fetched_at,
+                "mapped": mapped_devices,
+                "unmapped_meraki": unmapped_meraki_devices,
+            }, separators=(",", ":")))
@@ -2,6 +2,7 @@ import time
 
 import structlog
 
+from .logging_setup import configure_logging
 from .sync_logic import get_sync_interval, sync_pihole_dns
 
 log = structlog.get_logger()
@@ -25,4 +26,5 @@ def run_sync():
         time.sleep(sync_interval)
 
 if __name__ == "__main__":
+    configure_logging()
     run_sync()
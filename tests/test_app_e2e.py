@@ -1,6 +1,8 @@
+from unittest.mock import MagicMock, patch
+
 from fastapi.testclient import TestClient
 
-from app.app import app
+from app.app import _get_pihole_data, app
 
 client = TestClient(app, client=("127.0.0.1", 12345))
 
@@ -15,3 +17,22 @@ def test_update_interval():
     # Then
     assert response.status_code == 200
     assert response.json() == {"message": "Sync interval updated."}
+
+
+def test_get_pihole_data_recovers_after_failed_login():
+    # Given: the shared client's earlier login failed, and the records request logs in again.
+    pihole_client = MagicMock(sid=None)
+
+    def get_records():
+        pihole_client.sid = "123"
+        return {"test-client-1.lan": "192.168.1.10"}
+
+    pihole_client.get_custom_dns_records.side_effect = get_records
+
+    # When
+    with patch("app.app.get_pihole_client", return_value=pihole_client):
+        sid, records = _get_pihole_data("http://fake-pihole.local", "fake_pihole_key")
+
+    # Then
+    assert sid == "123"
+    assert records == {"test-client-1.lan": "192.168.1.10"}
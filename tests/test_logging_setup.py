@@ -0,0 +1,71 @@
+import logging
+import os
+import unittest
+from unittest.mock import patch
+
+import structlog
+from structlog.testing import capture_logs
+
+from app import logging_setup
+from app.logging_setup import configure_logging, is_debug_enabled
+
+
+class TestLoggingSetup(unittest.TestCase):
+    def setUp(self):
+        # Start every test unconfigured and restore whatever the app set up afterwards.
+        self._saved_config = structlog.get_config()
+        self._saved_level = logging_setup._log_level
+        logging_setup._log_level = logging.NOTSET
+        structlog.reset_defaults()
+
+    def tearDown(self):
+        structlog.configure(**self._saved_config)
+        logging_setup._log_level = self._saved_level
+
+    def test_configure_logging_reads_level_from_env(self):
+        # Act
+        with patch.dict(os.environ, {"LOG_LEVEL": "debug"}):
+            configure_logging()
+
+        # Assert
+        self.assertEqual(logging_setup._log_level, logging.DEBUG)
+        self.assertTrue(is_debug_enabled())
+
+    def test_configure_logging_falls_back_to_info_for_invalid_level(self):
+        # Act
+        with patch.dict(os.environ, {"LOG_LEVEL": "verbose"}):
+            configure_logging()
+
+        # Assert
+        self.assertEqual(logging_setup._log_level, logging.INFO)
+        self.assertFalse(is_debug_enabled())
+
+    def test_configure_logging_ignores_later_level_changes(self):
+        # Arrange
+        with patch.dict(os.environ, {"LOG_LEVEL": "INFO"}):
+            configure_logging()
+
+        # Act
+        with patch.dict(os.environ, {"LOG_LEVEL": "DEBUG"}):
+            configure_logging()
+
+        # Assert
+        self.assertFalse(is_debug_enabled())
+
+    def test_debug_logs_are_suppressed_at_info(self):
+        # Arrange
+        with patch.dict(os.environ, {"LOG_LEVEL": "INFO"}):
+            configure_logging()
+        log = structlog.get_logger()
+
+        # Act
+        with capture_logs() as logs:
+            log.debug("hidden")
+            log.info("shown")
+
+        # Assert
+        self.assertEqual([entry["event"] for entry in logs], ["shown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import sys
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import patch
@@ -27,6 +28,23 @@ class TestMerakiClient(unittest.TestCase):
 
         # Assert
         self.assertEqual(clients, [])
+        mock_dashboard.organizations.getOrganizationDevices.assert_called_once_with(
+            "12345", productTypes=["switch", "appliance"], total_pages="all"
+        )
+
+    @patch('meraki.DashboardAPI')
+    def test_get_all_relevant_meraki_clients_filters_specified_networks(self, mock_dashboard):
+        # Arrange
+        config = dict(self.config, meraki_network_ids=["net_1", "net_2"])
+        mock_dashboard.organizations.getOrganizationDevices.return_value = []
+
+        # Act
+        get_all_relevant_meraki_clients(mock_dashboard, config)
+
+        # Assert
+        mock_dashboard.organizations.getOrganizationDevices.assert_called_once_with(
+            "12345", productTypes=["switch", "appliance"], networkIds=["net_1", "net_2"], total_pages="all"
+        )
 
     @patch('meraki.DashboardAPI')
     def test_get_all_relevant_meraki_clients_with_clients_no_fixed_ip(self, mock_dashboard):
@@ -64,6 +82,103 @@ class TestMerakiClient(unittest.TestCase):
         self.assertEqual(clients[0]["name"], "Test Client")
         self.assertEqual(clients[0]["ip"], "1.2.3.4")
 
+    @patch('meraki.DashboardAPI')
+    def test_get_all_relevant_meraki_clients_lowercases_macs(self, mock_dashboard):
+        # Arrange
+        mock_dashboard.organizations.getOrganizationDevices.return_value = [
+            {"model": "MX", "serial": "123", "networkId": "net_123"}
+        ]
+        mock_dashboard.appliance.getNetworkApplianceVlans.return_value = [
+            {"fixedIpAssignments": {"AA:BB:CC:DD:EE:FF": {"ip": "1.2.3.4"}}, "name": "test_vlan"}
+        ]
+
+        # Act
+        clients = get_all_relevant_meraki_clients(mock_dashboard, self.config)
+
+        # Assert
+        self.assertEqual(clients[0]["meraki_client_id"], "aa:bb:cc:dd:ee:ff")
+        self.assertEqual(clients[0]["name"], "aa:bb:cc:dd:ee:ff")
+
+    @patch('meraki.DashboardAPI')
+    def test_get_all_relevant_meraki_clients_reuses_cached_devices(self, mock_dashboard):
+        # Arrange
+        config = dict(self.config, meraki_org_id="cached_org", meraki_devices_cache_ttl_seconds=3600)
+        mock_dashboard.organizations.getOrganizationDevices.return_value = []
+
+        # Act
+        get_all_relevant_meraki_clients(mock_dashboard, config)
+        get_all_relevant_meraki_clients(mock_dashboard, config)
+
+        # Assert
+        mock_dashboard.organizations.getOrganizationDevices.assert_called_once()
+
+    @patch('meraki.DashboardAPI')
+    def test_get_all_relevant_meraki_clients_deduplicates_network_reservations(self, mock_dashboard):
+        # Arrange
+        mock_dashboard.organizations.getOrganizationDevices.return_value = [
+            {"model": "MX", "serial": "123", "networkId": "net_123"},
+            {"model": "MX", "serial": "456", "networkId": "net_123"},
+        ]
+        mock_dashboard.appliance.getNetworkApplianceVlans.return_value = [
+            {"fixedIpAssignments": {"mac_1": {"name": "Test Client", "ip": "1.2.3.4"}}, "name": "test_vlan"}
+        ]
+
+        # Act
+        clients = get_all_relevant_meraki_clients(mock_dashboard, self.config)
+
+        # Assert
+        self.assertEqual(len(clients), 1)
+        mock_dashboard.appliance.getNetworkApplianceVlans.assert_called_once_with("net_123")
+
+    @patch('meraki.DashboardAPI')
+    def test_get_all_relevant_meraki_clients_deduplicates_repeated_assignments(self, mock_dashboard):
+        # Arrange: the switch and the appliance in one network both report the same reservation.
+        mock_dashboard.organizations.getOrganizationDevices.return_value = [
+            {"model": "MS", "serial": "123", "networkId": "net_123"},
+            {"model": "MX", "serial": "456", "networkId": "net_123"},
+        ]
+        mock_dashboard.switch.getDeviceSwitchRoutingInterfaces.return_value = [{"interfaceId": "int_1"}]
+        mock_dashboard.switch.getDeviceSwitchRoutingInterfaceDhcp.return_value = {
+            "fixedIpAssignments": {"AA:BB:CC:DD:EE:FF": {"name": "Test Client", "ip": "1.2.3.4"}}
+        }
+        mock_dashboard.appliance.getNetworkApplianceVlans.return_value = [
+            {"fixedIpAssignments": {"aa:bb:cc:dd:ee:ff": {"name": "Test Client", "ip": "1.2.3.4"}}, "name": "test_vlan"}
+        ]
+
+        # Act
+        clients = get_all_relevant_meraki_clients(mock_dashboard, self.config)
+
+        # Assert
+        self.assertEqual(len(clients), 1)
+        self.assertEqual(clients[0]["meraki_client_id"], "aa:bb:cc:dd:ee:ff")
+        self.assertEqual(clients[0]["ip"], "1.2.3.4")
+
+    @patch('meraki.DashboardAPI')
+    def test_get_all_relevant_meraki_clients_keeps_lowest_serial_for_repeated_assignments(self, mock_dashboard):
+        # Arrange: the switch is listed first and answers first, but the appliance has the lower serial.
+        mock_dashboard.organizations.getOrganizationDevices.return_value = [
+            {"model": "MS", "serial": "456", "networkId": "net_123"},
+            {"model": "MX", "serial": "123", "networkId": "net_123"},
+        ]
+        mock_dashboard.switch.getDeviceSwitchRoutingInterfaces.return_value = [{"interfaceId": "int_1"}]
+        mock_dashboard.switch.getDeviceSwitchRoutingInterfaceDhcp.return_value = {
+            "fixedIpAssignments": {"aa:bb:cc:dd:ee:ff": {"name": "Switch Client", "ip": "1.2.3.4"}}
+        }
+
+        def slow_vlans(network_id):
+            time.sleep(0.05)
+            return [{"fixedIpAssignments": {"aa:bb:cc:dd:ee:ff": {"name": "Appliance Client", "ip": "1.2.3.5"}}, "name": "test_vlan"}]
+
+        mock_dashboard.appliance.getNetworkApplianceVlans.side_effect = slow_vlans
+
+        # Act
+        clients = get_all_relevant_meraki_clients(mock_dashboard, self.config)
+
+        # Assert
+        self.assertEqual(len(clients), 1)
+        self.assertEqual(clients[0]["name"], "Appliance Client")
+        self.assertEqual(clients[0]["ip"], "1.2.3.5")
+
     @patch('meraki.DashboardAPI')
     def test_get_all_relevant_meraki_clients_with_clients_with_fixed_ip_appliance(self, mock_dashboard):
         # Arrange
@@ -1,17 +1,34 @@
+import json
+import os
+import tempfile
+import time
 import unittest
-from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
-from app.sync_logic import sync_pihole_dns
+from app.sync_logic import (
+    _append_changelog,
+    _changelog_mappings,
+    _create_meraki_dashboard,
+    _create_pihole_client,
+    _load_changelog_mappings,
+    get_meraki_dashboard,
+    get_pihole_client,
+    load_app_config_from_env,
+    sanitize_hostname,
+    sync_pihole_dns,
+)
 
 
 class TestMerakiPiholeSync(unittest.TestCase):
 
-    @patch('app.sync_logic.load_app_config_from_env')
-    @patch('app.sync_logic.get_meraki_data')
-    @patch('app.sync_logic.PiholeClient')
-    def test_sync_pihole_dns_success_flow(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
-        # Arrange
-        mock_load_config.return_value = {
+    def setUp(self):
+        _create_pihole_client.cache_clear()
+
+    def _config(self, data_dir="/tmp", **overrides):
+        # The settings every sync needs, with the data files kept in data_dir.
+        config = {
             "meraki_api_key": "fake_meraki_key",
             "pihole_api_url": "http://fake-pihole.local",
             "pihole_api_key": "fake_pihole_key",
@@ -19,42 +36,136 @@ class TestMerakiPiholeSync(unittest.TestCase):
             "meraki_org_id": "fake_org_id",
             "meraki_network_ids": [],
             "meraki_client_timespan_seconds": 86400,
-            "changelog_file_path": "/tmp/changelog.log",
-            "history_file_path": "/tmp/history.log",
-            "cache_file_path": "/tmp/cache.json",
+            "changelog_file_path": str(Path(data_dir) / "changelog.log"),
+            "history_file_path": str(Path(data_dir) / "history.log"),
+            "cache_file_path": str(Path(data_dir) / "cache.json"),
         }
+        config.update(overrides)
+        return config
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_success_flow(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        mock_load_config.return_value = self._config()
         mock_get_meraki_data.return_value = [
             {"name": "Test-Client-1", "ip": "192.168.1.10"}
         ]
         mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
-        mock_pihole_client.return_value.add_or_update_dns_record.return_value = True
+        mock_pihole_client.return_value.apply_dns_changes.return_value = True
 
         # Act
         sync_pihole_dns()
 
         # Assert
         self.assertEqual(mock_get_meraki_data.call_count, 1)
+        mock_pihole_client.return_value.apply_dns_changes.assert_called_once_with(
+            {"test-client-1.lan": "192.168.1.10"}, []
+        )
+        mock_pihole_client.return_value.add_or_update_dns_record.assert_not_called()
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_falls_back_to_per_record_updates(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        mock_load_config.return_value = self._config()
+        mock_get_meraki_data.return_value = [
+            {"name": "Test-Client-1", "ip": "192.168.1.10"}
+        ]
+        mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+        mock_pihole_client.return_value.apply_dns_changes.return_value = False
+        mock_pihole_client.return_value.add_or_update_dns_record.return_value = True
+
+        # Act
+        sync_pihole_dns()
+
+        # Assert
         mock_pihole_client.return_value.add_or_update_dns_record.assert_called_once_with(
             "test-client-1.lan", "192.168.1.10", existing_records={}
         )
 
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_fallback_removes_superseded_ip(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        mock_load_config.return_value = self._config()
+        mock_get_meraki_data.return_value = [
+            {"name": "Test-Client-1", "ip": "192.168.1.10"}
+        ]
+        mock_pihole_client.return_value.get_custom_dns_records.return_value = {"test-client-1.lan": "192.168.1.99"}
+        mock_pihole_client.return_value.apply_dns_changes.return_value = False
+        mock_pihole_client.return_value.add_or_update_dns_record.return_value = True
+        mock_pihole_client.return_value.remove_dns_record.return_value = True
+
+        # Act
+        sync_pihole_dns()
+
+        # Assert
+        mock_pihole_client.return_value.add_or_update_dns_record.assert_called_once_with(
+            "test-client-1.lan", "192.168.1.10", existing_records={"test-client-1.lan": "192.168.1.99"}
+        )
+        mock_pihole_client.return_value.remove_dns_record.assert_called_once_with("test-client-1.lan", "192.168.1.99")
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_fallback_keeps_old_ip_when_add_fails(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_path = Path(tmp_dir) / "sync_state.txt"
+            cache_path = Path(tmp_dir) / "cache.json"
+            mock_load_config.return_value = self._config(tmp_dir, sync_state_file_path=str(state_path))
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"}
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {"test-client-1.lan": "192.168.1.99"}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = False
+            mock_pihole_client.return_value.add_or_update_dns_record.return_value = False
+
+            # Act
+            sync_pihole_dns()
+            cache = json.loads(cache_path.read_text())
+
+            # Assert
+            mock_pihole_client.return_value.remove_dns_record.assert_not_called()
+            self.assertEqual(cache["pihole"], {"test-client-1.lan": "192.168.1.99"})
+            self.assertFalse(state_path.exists())
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_fallback_retries_when_superseded_delete_fails(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_path = Path(tmp_dir) / "sync_state.txt"
+            cache_path = Path(tmp_dir) / "cache.json"
+            mock_load_config.return_value = self._config(tmp_dir, sync_state_file_path=str(state_path))
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"}
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {"test-client-1.lan": "192.168.1.99"}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = False
+            mock_pihole_client.return_value.add_or_update_dns_record.return_value = True
+            mock_pihole_client.return_value.remove_dns_record.return_value = False
+
+            # Act
+            sync_pihole_dns()
+            cache = json.loads(cache_path.read_text())
+
+            # Assert
+            mock_pihole_client.return_value.remove_dns_record.assert_called_once_with("test-client-1.lan", "192.168.1.99")
+            self.assertEqual(cache["pihole"], {"test-client-1.lan": "192.168.1.10"})
+            self.assertFalse(state_path.exists())
+
     @patch('app.sync_logic.load_app_config_from_env')
     @patch('app.sync_logic.get_meraki_data')
     @patch('app.sync_logic.PiholeClient')
     def test_sync_pihole_dns_handles_client_with_no_name(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
         # Arrange
-        mock_load_config.return_value = {
-            "meraki_api_key": "fake_meraki_key",
-            "pihole_api_url": "http://fake-pihole.local",
-            "pihole_api_key": "fake_pihole_key",
-            "hostname_suffix": ".lan",
-            "meraki_org_id": "fake_org_id",
-            "meraki_network_ids": [],
-            "meraki_client_timespan_seconds": 86400,
-            "changelog_file_path": "/tmp/changelog.log",
-            "history_file_path": "/tmp/history.log",
-            "cache_file_path": "/tmp/cache.json",
-        }
+        mock_load_config.return_value = self._config()
         mock_get_meraki_data.return_value = [
             {"name": None, "ip": "192.168.1.11"}
         ]
@@ -67,5 +178,358 @@ class TestMerakiPiholeSync(unittest.TestCase):
         # Assert
         mock_pihole_client.return_value.add_or_update_dns_record.assert_not_called()
 
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_skips_pihole_without_meraki_clients(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        mock_load_config.return_value = self._config()
+        mock_get_meraki_data.return_value = []
+
+        # Act
+        sync_pihole_dns()
+
+        # Assert
+        mock_pihole_client.assert_not_called()
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_removes_only_stale_managed_records(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        mock_load_config.return_value = self._config()
+        mock_get_meraki_data.return_value = [
+            {"name": "Test-Client-1", "ip": "192.168.1.10"}
+        ]
+        mock_pihole_client.return_value.get_custom_dns_records.return_value = {
+            "test-client-1.lan": "192.168.1.10",
+            "old-client.lan": "192.168.1.20",
+            "nas.home": "192.168.1.30",
+        }
+        mock_pihole_client.return_value.apply_dns_changes.return_value = False
+        mock_pihole_client.return_value.add_or_update_dns_record.return_value = True
+        mock_pihole_client.return_value.remove_dns_record.return_value = True
+
+        # Act
+        sync_pihole_dns()
+
+        # Assert
+        mock_pihole_client.return_value.add_or_update_dns_record.assert_not_called()
+        mock_pihole_client.return_value.remove_dns_record.assert_called_once_with("old-client.lan", "192.168.1.20")
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_appends_only_changed_mappings_to_changelog(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            changelog_path = Path(tmp_dir) / "changelog.log"
+            changelog_path.write_text("2024-01-01 00:00:00: Mapped test-client-1.lan to 192.168.1.10\n")
+            mock_load_config.return_value = self._config(tmp_dir)
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"},
+                {"name": "Test-Client-2", "ip": "192.168.1.11"},
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = True
+
+            # Act
+            sync_pihole_dns()
+            lines = changelog_path.read_text().splitlines()
+
+        # Assert
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith("Mapped test-client-1.lan to 192.168.1.10"))
+        self.assertTrue(lines[1].endswith("Mapped test-client-2.lan to 192.168.1.11"))
+
+    @patch('app.sync_logic.CHANGELOG_MAX_BYTES', 10)
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_rolls_over_oversized_changelog(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            changelog_path = Path(tmp_dir) / "changelog.log"
+            old_entry = "2024-01-01 00:00:00: Mapped test-client-1.lan to 192.168.1.10\n"
+            changelog_path.write_text(old_entry)
+            mock_load_config.return_value = self._config(tmp_dir)
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"}
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = True
+            # The mapping is already recorded, as it would be after an earlier sync in this process.
+            _changelog_mappings[str(changelog_path)] = {"test-client-1.lan": "192.168.1.10"}
+
+            # Act
+            sync_pihole_dns()
+            rolled_over = Path(tmp_dir, "changelog.log.1").read_text()
+            lines = changelog_path.read_text().splitlines()
+            cached_mappings = _changelog_mappings.pop(str(changelog_path))
+
+        # Assert: the new file starts empty, so the current mapping is recorded again.
+        self.assertEqual(rolled_over, old_entry)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith("Mapped test-client-1.lan to 192.168.1.10"))
+        self.assertEqual(cached_mappings, {"test-client-1.lan": "192.168.1.10"})
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_keeps_cached_changelog_mappings_in_step_with_file(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            changelog_path = Path(tmp_dir) / "changelog.log"
+            mock_load_config.return_value = self._config(tmp_dir)
+            mock_pihole_client.return_value.apply_dns_changes.return_value = True
+
+            # Act: the second sync changes one client's IP and drops the other.
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"},
+                {"name": "Test-Client-2", "ip": "192.168.1.11"},
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+            sync_pihole_dns()
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.20"},
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {
+                "test-client-1.lan": "192.168.1.10",
+                "test-client-2.lan": "192.168.1.11",
+            }
+            sync_pihole_dns()
+            cached_mappings = _changelog_mappings.pop(str(changelog_path))
+            replayed_mappings = _load_changelog_mappings(changelog_path)
+
+        # Assert
+        self.assertEqual(cached_mappings, {"test-client-1.lan": "192.168.1.20"})
+        self.assertEqual(cached_mappings, replayed_mappings)
+
+    def test_append_changelog_serializes_concurrent_syncs(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            changelog_path = Path(tmp_dir) / "changelog.log"
+            batches = [{f"client-{i}.lan": f"192.168.1.{i}"} for i in range(20)]
+
+            # Act
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(lambda applied: _append_changelog(changelog_path, applied, []), batches))
+            cached_mappings = _changelog_mappings.pop(str(changelog_path))
+            replayed_mappings = _load_changelog_mappings(changelog_path)
+
+        # Assert
+        self.assertEqual(len(cached_mappings), 20)
+        self.assertEqual(cached_mappings, replayed_mappings)
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_skips_pihole_when_meraki_data_unchanged(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mock_load_config.return_value = self._config(tmp_dir, sync_state_file_path=str(Path(tmp_dir) / "sync_state.txt"))
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"}
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = True
+
+            # Act
+            sync_pihole_dns()
+            sync_pihole_dns()
+            history = Path(tmp_dir, "history.log").read_text().splitlines()
+
+        # Assert
+        mock_pihole_client.return_value.get_custom_dns_records.assert_called_once()
+        self.assertEqual([line.split(",")[1] for line in history], ["1", "1"])
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_reuses_fresh_cached_meraki_clients(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = Path(tmp_dir) / "cache.json"
+            cache_path.write_text(json.dumps({
+                "meraki": [{"name": "Test-Client-1", "ip": "192.168.1.10"}],
+                "meraki_fetched_at": time.time(),
+            }))
+            mock_load_config.return_value = self._config(tmp_dir, meraki_cache_ttl_seconds=300)
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = True
+
+            # Act
+            sync_pihole_dns()
+
+        # Assert
+        mock_get_meraki_data.assert_not_called()
+        mock_pihole_client.return_value.apply_dns_changes.assert_called_once_with(
+            {"test-client-1.lan": "192.168.1.10"}, []
+        )
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_cached_sync_does_not_extend_meraki_ttl(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = Path(tmp_dir) / "cache.json"
+            fetched_at = time.time() - 200
+            cache_path.write_text(json.dumps({
+                "meraki": [{"name": "Test-Client-1", "ip": "192.168.1.10"}],
+                "meraki_fetched_at": fetched_at,
+            }))
+            mock_load_config.return_value = self._config(tmp_dir, meraki_cache_ttl_seconds=300)
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.10"}
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = False
+            mock_pihole_client.return_value.add_or_update_dns_record.return_value = False
+
+            # Act: the first sync uses the cache and rewrites the file; the second runs after
+            # the original fetch has expired.
+            sync_pihole_dns()
+            stored_fetched_at = json.loads(cache_path.read_text())["meraki_fetched_at"]
+            with patch('app.sync_logic.time.time', return_value=fetched_at + 301):
+                sync_pihole_dns()
+
+        # Assert
+        self.assertEqual(stored_fetched_at, fetched_at)
+        mock_get_meraki_data.assert_called_once()
+
+    @patch('app.sync_logic.load_app_config_from_env')
+    @patch('app.sync_logic.get_meraki_data')
+    @patch('app.sync_logic.PiholeClient')
+    def test_sync_pihole_dns_meraki_update_refreshes_cached_clients(self, mock_pihole_client, mock_get_meraki_data, mock_load_config):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = Path(tmp_dir) / "cache.json"
+            cache_path.write_text(json.dumps({
+                "pihole": {"test-client-1.lan": "192.168.1.10"},
+                "meraki": [{"name": "Test-Client-1", "ip": "192.168.1.10"}],
+                "meraki_fetched_at": time.time(),
+            }))
+            mock_load_config.return_value = self._config(tmp_dir, meraki_cache_ttl_seconds=300)
+            mock_get_meraki_data.return_value = [
+                {"name": "Test-Client-1", "ip": "192.168.1.20"}
+            ]
+            mock_pihole_client.return_value.get_custom_dns_records.return_value = {"test-client-1.lan": "192.168.1.10"}
+            mock_pihole_client.return_value.apply_dns_changes.return_value = True
+
+            # Act: a Meraki update from the UI, then a scheduled sync within the TTL.
+            sync_pihole_dns("meraki")
+            cache = json.loads(cache_path.read_text())
+            sync_pihole_dns()
+
+        # Assert
+        self.assertEqual(cache["meraki"], [{"name": "Test-Client-1", "ip": "192.168.1.20"}])
+        self.assertEqual(cache["pihole"], {"test-client-1.lan": "192.168.1.10"})
+        mock_get_meraki_data.assert_called_once()
+        mock_pihole_client.return_value.apply_dns_changes.assert_called_once_with(
+            {"test-client-1.lan": "192.168.1.20"}, []
+        )
+
+    @patch('app.sync_logic.PiholeClient')
+    def test_get_pihole_client_creates_one_client_for_concurrent_callers(self, mock_pihole_client):
+        # Arrange: a slow login widens the window in which both threads could miss the cache.
+        mock_pihole_client.side_effect = lambda *args, **kwargs: time.sleep(0.05) or MagicMock()
+
+        # Act
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            clients = list(executor.map(
+                lambda _: get_pihole_client("http://fake-pihole.local", "fake_pihole_key"), range(2)
+            ))
+
+        # Assert
+        mock_pihole_client.assert_called_once()
+        self.assertIs(clients[0], clients[1])
+
+    @patch('app.sync_logic.meraki.DashboardAPI')
+    def test_get_meraki_dashboard_creates_one_dashboard_for_concurrent_callers(self, mock_dashboard):
+        # Arrange
+        _create_meraki_dashboard.cache_clear()
+        mock_dashboard.side_effect = lambda *args, **kwargs: time.sleep(0.05) or MagicMock()
+
+        # Act
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dashboards = list(executor.map(lambda _: get_meraki_dashboard("fake_meraki_key", 5, 30), range(2)))
+        _create_meraki_dashboard.cache_clear()
+
+        # Assert
+        mock_dashboard.assert_called_once()
+        self.assertIs(dashboards[0], dashboards[1])
+
+    def test_sanitize_hostname_strips_invalid_characters(self):
+        self.assertEqual(sanitize_hostname("Test Client 1"), "test-client-1")
+        self.assertEqual(sanitize_hostname("John's iPhone_2"), "johns-iphone-2")
+        self.assertEqual(sanitize_hostname("!!!"), "")
+
+
+class TestLoadAppConfigFromEnv(unittest.TestCase):
+
+    MANDATORY_ENV = {
+        "MERAKI_API_KEY": "fake_meraki_key",
+        "MERAKI_ORG_ID": "fake_org_id",
+        "PIHOLE_API_URL": "http://fake-pihole.local",
+        "PIHOLE_API_KEY": "fake_pihole_key",
+        "HOSTNAME_SUFFIX": ".lan",
+    }
+
+    def setUp(self):
+        load_app_config_from_env.cache_clear()
+
+    def tearDown(self):
+        load_app_config_from_env.cache_clear()
+
+    def _load(self, **overrides):
+        with patch.dict(os.environ, {**self.MANDATORY_ENV, **overrides}, clear=True):
+            return load_app_config_from_env()
+
+    def test_tuning_settings_use_defaults_when_unset(self):
+        # Act
+        config = self._load()
+
+        # Assert
+        self.assertEqual(config["meraki_cache_ttl_seconds"], 0)
+        self.assertEqual(config["meraki_max_concurrency"], 5)
+        self.assertEqual(config["meraki_max_retries"], 5)
+        self.assertEqual(config["meraki_request_timeout_seconds"], 30)
+        self.assertEqual(config["pihole_records_cache_ttl_seconds"], 0)
+
+    def test_tuning_settings_read_valid_values(self):
+        # Act
+        config = self._load(
+            MERAKI_CACHE_TTL_SECONDS="300",
+            MERAKI_MAX_CONCURRENCY="2",
+            MERAKI_MAX_RETRIES="0",
+            MERAKI_TIMEOUT_SECONDS="10",
+            PIHOLE_RECORDS_CACHE_TTL_SECONDS="60",
+        )
+
+        # Assert
+        self.assertEqual(config["meraki_cache_ttl_seconds"], 300)
+        self.assertEqual(config["meraki_max_concurrency"], 2)
+        self.assertEqual(config["meraki_max_retries"], 0)
+        self.assertEqual(config["meraki_request_timeout_seconds"], 10)
+        self.assertEqual(config["pihole_records_cache_ttl_seconds"], 60)
+
+    def test_tuning_settings_fall_back_to_defaults_when_invalid_or_out_of_range(self):
+        # Act
+        config = self._load(
+            MERAKI_CACHE_TTL_SECONDS="-1",
+            MERAKI_MAX_CONCURRENCY="0",
+            MERAKI_MAX_RETRIES="many",
+            MERAKI_TIMEOUT_SECONDS="0",
+            PIHOLE_RECORDS_CACHE_TTL_SECONDS="-5",
+        )
+
+        # Assert
+        self.assertEqual(config["meraki_cache_ttl_seconds"], 0)
+        self.assertEqual(config["meraki_max_concurrency"], 5)
+        self.assertEqual(config["meraki_max_retries"], 5)
+        self.assertEqual(config["meraki_request_timeout_seconds"], 30)
+        self.assertEqual(config["pihole_records_cache_ttl_seconds"], 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import MagicMock, patch
 
-from app.clients.pihole_client import PiholeClient
+import requests
+
+from app.clients.pihole_client import PiholeClient, normalize_pihole_url
 
 
 class TestPiholeClient(unittest.TestCase):
@@ -20,6 +22,57 @@ class TestPiholeClient(unittest.TestCase):
         self.assertEqual(client.sid, "123")
         self.assertEqual(client.csrf_token, "abc")
 
+    @patch('app.clients.pihole_client.requests.delete')
+    @patch('app.clients.pihole_client.requests.Session')
+    def test_close_logs_out_and_closes_session(self, mock_session, mock_delete):
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"session": {"valid": True, "sid": "123", "csrf": "abc"}}
+        mock_session.return_value.post.return_value = mock_response
+
+        # Act
+        with PiholeClient("http://pi.hole", "password") as client:
+            pass
+
+        # Assert
+        mock_delete.assert_called_once_with(
+            "http://pi.hole/api/auth", headers={"X-CSRF-Token": "abc"}, cookies={"SID": "123"}, timeout=2
+        )
+        mock_session.return_value.delete.assert_not_called()
+        mock_session.return_value.close.assert_called_once()
+        self.assertIsNone(client.sid)
+
+    @patch('app.clients.pihole_client.requests.delete')
+    @patch('app.clients.pihole_client.requests.Session')
+    def test_close_ignores_logout_failure(self, mock_session, mock_delete):
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"session": {"valid": True, "sid": "123", "csrf": "abc"}}
+        mock_session.return_value.post.return_value = mock_response
+        mock_delete.side_effect = requests.exceptions.ConnectTimeout()
+        client = PiholeClient("http://pi.hole", "password")
+
+        # Act
+        client.close()
+
+        # Assert
+        mock_session.return_value.close.assert_called_once()
+
+    @patch('app.clients.pihole_client.requests.Session')
+    def test_authenticate_stores_credentials_on_session(self, mock_session):
+        # Arrange
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"session": {"valid": True, "sid": "123", "csrf": "abc"}}
+        mock_session.return_value.post.return_value = mock_response
+        mock_session.return_value.headers = {}
+
+        # Act
+        client = PiholeClient("http://pi.hole", "password")
+
+        # Assert
+        self.assertEqual(client.session.headers["X-CSRF-Token"], "abc")
+        mock_session.return_value.cookies.set.assert_called_once_with("SID", "123")
+
     @patch('app.clients.pihole_client.requests.Session')
     def test_get_custom_dns_records_success(self, mock_session):
         # Arrange
@@ -86,5 +139,73 @@ class TestPiholeClient(unittest.TestCase):
         self.assertTrue(result)
         mock_api_request.assert_not_called()
 
+    @patch('app.clients.pihole_client.PiholeClient.authenticate')
+    @patch('app.clients.pihole_client.requests.Session')
+    def test_api_request_stops_retrying_after_repeated_403(self, mock_session, mock_authenticate):
+        # Arrange
+        client = PiholeClient("http://pi.hole", "password")
+        client.sid = "123"
+        client.csrf_token = "abc"
+        mock_authenticate.side_effect = lambda: setattr(client, "sid", "456") or setattr(client, "csrf_token", "def")
+        mock_response = MagicMock()
+        mock_response.status_code = 403
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=mock_response)
+        mock_session.return_value.request.return_value = mock_response
+
+        # Act
+        result = client._api_request("GET", "/api/config/dns/hosts")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertEqual(mock_session.return_value.request.call_count, 2)
+
+    @patch('app.clients.pihole_client.requests.Session')
+    def test_get_custom_dns_records_reuses_cache_until_write(self, mock_session):
+        # Arrange
+        client = PiholeClient("http://pi.hole", "password", records_cache_ttl=60)
+        client.sid = "123"
+        client.csrf_token = "abc"
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"config": {"dns": {"hosts": ["1.2.3.4 test.com"]}}, "success": True}
+        mock_session.return_value.request.return_value = mock_response
+
+        # Act
+        first = client.get_custom_dns_records()
+        second = client.get_custom_dns_records()
+        client.remove_dns_record("test.com", "1.2.3.4")
+        client.get_custom_dns_records()
+
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual(mock_session.return_value.request.call_count, 3)
+
+    @patch('app.clients.pihole_client.PiholeClient._api_request')
+    @patch('app.clients.pihole_client.requests.Session')
+    def test_apply_dns_changes_patches_hosts_once(self, mock_session, mock_api_request):
+        # Arrange
+        mock_session.return_value.post.return_value.json.return_value = {"session": {"valid": True, "sid": "123", "csrf": "abc"}}
+        client = PiholeClient("http://pi.hole", "password")
+        mock_api_request.side_effect = [
+            {"config": {"dns": {"hosts": ["1.1.1.1 keep.home", "2.2.2.2 moved.lan", "3.3.3.3 stale.lan", "4.4.4.4 a.home b.home"]}}},
+            {"config": {}},
+        ]
+
+        # Act
+        result = client.apply_dns_changes({"moved.lan": "5.5.5.5", "new.lan": "6.6.6.6"}, [("stale.lan", "3.3.3.3")])
+
+        # Assert
+        self.assertTrue(result)
+        mock_api_request.assert_called_with(
+            "PATCH",
+            "/api/config",
+            {"config": {"dns": {"hosts": ["1.1.1.1 keep.home", "4.4.4.4 a.home b.home", "5.5.5.5 moved.lan", "6.6.6.6 new.lan"]}}},
+        )
+
+    def test_normalize_pihole_url_strips_legacy_suffixes(self):
+        self.assertEqual(normalize_pihole_url("http://pi.hole/admin/api.php"), "http://pi.hole")
+        self.assertEqual(normalize_pihole_url("http://pi.hole/admin/"), "http://pi.hole")
+        self.assertEqual(normalize_pihole_url("http://pi.hole/"), "http://pi.hole")
+        self.assertEqual(normalize_pihole_url("http://pi.hole"), "http://pi.hole")
+
 if __name__ == '__main__':
     unittest.main()